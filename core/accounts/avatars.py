@@ -0,0 +1,65 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import note_cache_invalidation, primary_reads
+
+from .models import Profile
+
+
+def avatar_cache_key(email):
+    return "accounts:avatar:" + md5(email.encode()).hexdigest()
+
+
+def get_default_avatar_url():
+    field = Profile._meta.get_field("image")
+    return field.storage.url(field.default)
+
+
+def get_avatar_urls(emails):
+    """
+    Return a dict of email -> avatar url for the given emails.
+
+    Urls are read from the cache first, the missing ones are resolved with
+    one query and emails without a profile (anonymous commenters) get the
+    default avatar.
+    """
+    emails = set(emails)
+    if not emails:
+        return {}
+    keys = {avatar_cache_key(email): email for email in emails}
+    avatars = {
+        keys[key]: url for key, url in cache.get_many(list(keys)).items()
+    }
+    missing = emails - avatars.keys()
+    if not missing:
+        return avatars
+
+    storage = Profile._meta.get_field("image").storage
+    default = get_default_avatar_url()
+    found = {}
+    # stored in the shared cache, see core.routers.primary_reads
+    with primary_reads():
+        profiles = list(
+            Profile.objects.filter(user__email__in=missing)
+            .order_by("id")
+            .values_list("user__email", "image")
+        )
+    for email, image in profiles:
+        # a user may own several profiles, keep the first one like
+        # Profile.objects.filter(...).first() would
+        found.setdefault(email, storage.url(image) if image else default)
+    for email in missing:
+        found.setdefault(email, default)
+    cache.set_many(
+        {avatar_cache_key(email): url for email, url in found.items()},
+        settings.AVATAR_CACHE_TIMEOUT,
+    )
+    avatars.update(found)
+    return avatars
+
+
+def forget_avatar(email):
+    note_cache_invalidation()
+    cache.delete(avatar_cache_key(email))
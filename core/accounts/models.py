@@ -1,6 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.urls import reverse
 from rest_framework.authtoken.models import Token
@@ -74,3 +74,16 @@ def save_profile_create_token(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_avatar(sender, instance, **kwargs):
+    """
+    Drop the cached avatar url of the profile owner, a new profile also
+    replaces the default avatar cached for an unknown email.
+    """
+    from accounts.avatars import forget_avatar
+
+    email = instance.user.email
+    transaction.on_commit(lambda: forget_avatar(email))
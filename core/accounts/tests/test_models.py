@@ -1,5 +1,6 @@
 import pytest
 
+from ..avatars import get_avatar_urls
 from ..models import User, Profile
 
 
@@ -71,3 +72,22 @@ class TestAccountsModel:
         assert profile_obj.first_name == "first_name"
         assert profile_obj.last_name == "last_name"
         assert profile_obj.description == "description"
+
+    def test_profile_image_change_invalidates_avatar(
+        self, basic_user, django_capture_on_commit_callbacks
+    ):
+        """
+        Test the cached avatar url is dropped when the profile changes
+        """
+        email = basic_user.email
+        assert get_avatar_urls([email, "guest@test.com"]) == {
+            email: "/media/accounts/avatars/default.jpg",
+            "guest@test.com": "/media/accounts/avatars/default.jpg",
+        }
+        profile = Profile.objects.get(user=basic_user)
+        profile.image = "accounts/avatars/new.jpg"
+        with django_capture_on_commit_callbacks(execute=True):
+            profile.save()
+        assert get_avatar_urls([email]) == {
+            email: "/media/accounts/avatars/new.jpg"
+        }
@@ -0,0 +1,16 @@
+from rest_framework.filters import SearchFilter
+
+from ...search import full_text_search_available, search_posts
+
+
+class PostSearchFilter(SearchFilter):
+    """
+    SearchFilter that uses PostgreSQL full text search for posts and falls
+    back to the default icontains lookups on other databases.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not full_text_search_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        query = request.query_params.get(self.search_param, "")
+        return search_posts(queryset, query)
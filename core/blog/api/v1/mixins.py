@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from core.routers import primary_reads
+
+from ...caching import get_generation, make_key
+
+
+class CachedResponseMixin:
+    """
+    Cache the response data of anonymous GET requests.
+
+    Entries are stored under the current blog generation (see
+    blog.caching), so any change to posts, categories or comments makes
+    them stale immediately instead of waiting for the timeout.
+    """
+
+    cache_timeout = settings.BLOG_API_CACHE_TIMEOUT
+
+    def is_response_cacheable(self, request):
+        return request.method == "GET" and not request.user.is_authenticated
+
+    def get_response_cache_key(self, request, *args, **kwargs):
+        query = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+        )
+        return make_key(
+            "api",
+            request.get_host(),
+            self.__class__.__name__,
+            sorted(kwargs.items()),
+            query,
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request, *args, **kwargs)
+        version = get_generation()
+        data = cache.get(key, version=version)
+        if data is not None:
+            return Response(data)
+        with primary_reads():
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout, version=version)
+        return response
+
+
+class SparsePostQuerysetMixin:
+    """
+    Build the Post queryset out of the fields the serializer will render,
+    so deferred columns and unused relations are never loaded.
+    """
+
+    detail = False
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset.select_related("author__user")
+        fields = self.get_serializer_class().get_sparse_fields(
+            self.request, self.detail
+        )
+        return self.get_serializer_class().setup_queryset(queryset, fields)
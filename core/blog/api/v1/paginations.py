@@ -1,5 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from ...keyset import (
+    COMMENT_ORDERING,
+    POST_ORDERING,
+    InvalidCursor,
+    KeysetPaginator,
+)
+from ...paginator import CachedCountPaginator
 
 
 class CustomPagination(PageNumberPagination):
@@ -7,6 +17,7 @@ class CustomPagination(PageNumberPagination):
     Custom pagination class
     """
 
+    django_paginator_class = CachedCountPaginator
     page_size = 4
 
     def get_paginated_response(self, data):
@@ -23,3 +34,101 @@ class CustomPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination, see blog.keyset.KeysetPaginator.
+
+    No COUNT query is run and a deep page costs the same as the first one,
+    next and previous links carry an opaque cursor.
+    """
+
+    page_size = 4
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    count_label = "no. of items in this page"
+    # (field name, descending) pairs, ending with a unique field
+    ordering = (("id", True),)
+
+    def get_paginator(self):
+        return KeysetPaginator(self.ordering, self.page_size)
+
+    def get_base_url(self, request):
+        return request.build_absolute_uri()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = self.get_base_url(request)
+        try:
+            self.page = self.get_paginator().paginate(
+                queryset, request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            raise NotFound(self.invalid_cursor_message)
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "links": {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                },
+                self.count_label: len(data),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        return self.build_link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self.build_link(self.page.previous_cursor)
+
+    def build_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+
+class PostCursorPagination(KeysetCursorPagination):
+    """
+    Opt-in keyset pagination of the post list, keyed on Post.Meta.ordering
+    plus id.
+    """
+
+    mode_query_param = "pagination"
+    mode_query_value = "cursor"
+    count_label = "no. of posts in this page"
+    ordering = POST_ORDERING
+
+    @classmethod
+    def is_requested(cls, request):
+        """
+        Return True if the client asked for the cursor mode.
+        """
+        return (
+            request.query_params.get(cls.mode_query_param)
+            == cls.mode_query_value
+            or cls.cursor_query_param in request.query_params
+        )
+
+    def get_base_url(self, request):
+        return replace_query_param(
+            request.build_absolute_uri(),
+            self.mode_query_param,
+            self.mode_query_value,
+        )
+
+
+class CommentCursorPagination(KeysetCursorPagination):
+    """
+    Keyset pagination of the comments of a post, keyed on
+    Comment.Meta.ordering plus id.
+    """
+
+    page_size = 10
+    count_label = "no. of comments in this page"
+    ordering = COMMENT_ORDERING
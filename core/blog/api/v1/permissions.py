@@ -1,10 +1,12 @@
 from rest_framework import permissions
 
+from ...permissions import is_post_owner
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
-    Object-level permission to only allow owners of an object to edit it.
-    Assumes the model instance has an `owner` attribute.
+    Object-level permission to only allow owners of a post to edit it.
+    Compares ids, load the post with select_related("author").
     """
 
     def has_object_permission(self, request, view, obj):
@@ -13,4 +15,4 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        return obj.author.user == request.user
+        return is_post_owner(obj, request.user)
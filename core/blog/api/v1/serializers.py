@@ -1,7 +1,18 @@
+from collections import Counter
+
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.urls import reverse
 from django.utils.timezone import now
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.utils.urls import replace_query_param
 
 from ...models import Post, Category, Comment
+from ...caching import bump_generation, delete_widget
+from ...pagecache import purge_groups
+from ...widgets import schedule_widget_rebuild
+from .paginations import CommentCursorPagination
 from accounts.models import Profile, User
 
 
@@ -12,7 +23,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Category
-        fields = ["id", "name"]
+        fields = ["id", "name", "slug", "post_count"]
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
@@ -35,13 +46,124 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ["name", "email", "message", "created_date"]
 
 
+class CategoryPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    Category primary key field that looks the categories up in the
+    `categories` map of the serializer context when it is given, so a
+    batch of posts is validated without a query per category.
+    """
+
+    def to_internal_value(self, data):
+        categories = self.context.get("categories")
+        if categories is None:
+            return super().to_internal_value(data)
+        try:
+            return categories[int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+def invalidate_post_caches():
+    """
+    Everything the post signals of blog.models drop once new posts are
+    committed: cached responses, the category sidebar, the cached pages
+    of the post lists and the post widgets.
+    """
+    bump_generation()
+    delete_widget("categories")
+    purge_groups("posts", "sidebar")
+    schedule_widget_rebuild()
+
+
+class PostListSerializer(serializers.ListSerializer):
+    """
+    List serializer of posts that creates a batch of posts with one
+    bulk insert for the posts and one for their categories.
+    """
+
+    def create(self, validated_data):
+        author = Profile.objects.get(user=self.context.get("request").user)
+        current = now()
+        posts = []
+        post_categories = []
+        for data in validated_data:
+            data = dict(data)
+            # like .set(), a category given twice is added once
+            post_categories.append(
+                list(dict.fromkeys(data.pop("category", [])))
+            )
+            data["author"] = author
+            data["status"] = current >= data["published_date"]
+            post = Post(**data)
+            # bulk_create does not call save()
+            post.update_text_fields()
+            posts.append(post)
+
+        using = router.db_for_write(Post)
+        through = Post.category.through
+        with transaction.atomic(using=using):
+            if connections[using].features.can_return_rows_from_bulk_insert:
+                Post.objects.using(using).bulk_create(posts)
+            else:
+                # the backend can not give back the new ids of a bulk insert
+                for post in posts:
+                    post.save(using=using)
+            through.objects.using(using).bulk_create(
+                [
+                    through(post_id=post.id, category_id=category.id)
+                    for post, categories in zip(posts, post_categories)
+                    for category in categories
+                ]
+            )
+            # nor the ones that count the published posts of categories
+            published = Counter(
+                category.id
+                for post, categories in zip(posts, post_categories)
+                if post.status
+                for category in categories
+            )
+            for category_id, count in published.items():
+                Category.objects.using(using).filter(id=category_id).update(
+                    post_count=F("post_count") + count
+                )
+            # bulk inserts do not send the signals that invalidate caches
+            transaction.on_commit(invalidate_post_caches, using=using)
+        return posts
+
+
 class PostSerializer(serializers.ModelSerializer):
     """
     Class for serializing the Post model
+
+    GET requests can ask for a sparse fieldset with ?fields=title,image
+    or drop fields with ?omit=content, the views use setup_queryset() so
+    the excluded columns are never fetched from the database.
     """
 
     snippet = serializers.ReadOnlyField(source="get_snippet")
     relative_path = serializers.SerializerMethodField(read_only=True)
+    category = CategoryPrimaryKeyField(
+        many=True, queryset=Category.objects.all(), required=False
+    )
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    # fields that are only rendered for a single post or a list of posts
+    detail_only_fields = {"comment"}
+    list_only_fields = {"snippet", "relative_path"}
+    # fields that are not part of the default list response
+    list_excluded_fields = {"content"}
+    # model columns that can be left out of the SELECT, by field name
+    deferrable_fields = {
+        "title": "title",
+        "content": "content",
+        "snippet": "excerpt",
+        "image": "image",
+        "status": "status",
+        "word_count": "word_count",
+        "reading_time": "reading_time",
+        "comment_count": "comment_count",
+    }
 
     class Meta:
         model = Post
@@ -52,20 +174,84 @@ class PostSerializer(serializers.ModelSerializer):
             "title",
             "content",
             "snippet",
+            "word_count",
+            "reading_time",
             "image",
             "category",
             "status",
+            "comment_count",
             "published_date",
             "created_date",
         ]
         read_only_fields = ["author", "status", "created_date"]
+        list_serializer_class = PostListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        self.is_detail = False
+        self.sparse_fields = None
+        if request is not None:
+            self.is_detail = bool(
+                request.parser_context.get("kwargs").get("pk")
+            )
+            self.sparse_fields = self.get_sparse_fields(
+                request, self.is_detail
+            )
+            if request.method in SAFE_METHODS:
+                for name in set(self.fields) - self.sparse_fields:
+                    self.fields.pop(name)
+
+    @classmethod
+    def get_sparse_fields(cls, request, detail):
+        """
+        Return the names of the fields to render for this request, taking
+        ?fields= and ?omit= into account on GET requests.
+        """
+        available = set(cls.Meta.fields) | cls.detail_only_fields
+        available.add("headline")
+        if detail:
+            available -= cls.list_only_fields
+            default = set(available)
+        else:
+            available -= cls.detail_only_fields
+            default = available - cls.list_excluded_fields
+        if request.method not in SAFE_METHODS:
+            return default
+
+        fields = cls._parse_names(request, cls.fields_query_param)
+        names = (fields & available) if fields else default
+        return names - cls._parse_names(request, cls.omit_query_param)
+
+    @staticmethod
+    def _parse_names(request, param):
+        value = request.query_params.get(param, "")
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    @classmethod
+    def setup_queryset(cls, queryset, fields):
+        """
+        Eager load the relations and defer the columns that the given
+        fields do not need.
+        """
+        if "author" in fields:
+            queryset = queryset.select_related("author__user")
+        if "category" in fields:
+            queryset = queryset.prefetch_related("category")
+        deferred = {"search_vector", "updated_date"}
+        deferred.update(
+            column
+            for name, column in cls.deferrable_fields.items()
+            if name not in fields
+        )
+        return queryset.defer(*deferred)
 
     def get_categories(self, obj):
         """
-        Getting Categories for each Post
+        Getting Categories for each Post, the view is responsible for
+        prefetching them so this does not hit the database per row.
         """
-        post = Post.objects.get(title=obj)
-        category = CategorySerializer(post.category.all(), many=True)
+        category = CategorySerializer(obj.category.all(), many=True)
         return category.data
 
     def get_relative_path(self, obj):
@@ -81,21 +267,45 @@ class PostSerializer(serializers.ModelSerializer):
         list of Posts or retrieving one post.
         """
         rep = super().to_representation(instance)
-        request = self.context.get("request")
-        rep["category"] = self.get_categories(instance)
-        rep["author"] = CustomUserSerializer(
-            User.objects.get(email=instance.author.user)
-        ).data
-        if request.parser_context.get("kwargs").get("pk"):
-            rep.pop("snippet")
-            rep.pop("relative_path")
-            rep["comment"] = CommentSerializer(
-                Comment.objects.filter(post=instance), many=True
-            ).data
-        else:
-            rep.pop("content")
+        fields = self.sparse_fields or set(rep)
+        if "category" in rep:
+            rep["category"] = self.get_categories(instance)
+        if "author" in rep:
+            rep["author"] = CustomUserSerializer(instance.author.user).data
+        if hasattr(instance, "headline") and "headline" in fields:
+            # annotated by the full text search backend
+            rep["headline"] = instance.headline
+        for name in set(rep) - fields:
+            rep.pop(name)
+        if self.is_detail and "comment" in fields:
+            rep.update(self.get_comments(instance))
         return rep
 
+    def get_comments(self, instance):
+        """
+        Embedding only the first page of comments of a post, with the total
+        count and a link to the next page of the comments endpoint.
+        """
+        pagination = CommentCursorPagination()
+        page = pagination.get_paginator().paginate(instance.comment_set.all())
+        next_link = None
+        if page.next_cursor:
+            next_link = replace_query_param(
+                self.context.get("request").build_absolute_uri(
+                    reverse(
+                        "blog:api-v1:post-comments",
+                        kwargs={"pk": instance.pk},
+                    )
+                ),
+                pagination.cursor_query_param,
+                page.next_cursor,
+            )
+        return {
+            "comment": CommentSerializer(page, many=True).data,
+            "comment_count": instance.comment_count,
+            "comment_next": next_link,
+        }
+
     def create(self, validated_data):
         """
         Creating a post with author is the user that is currently
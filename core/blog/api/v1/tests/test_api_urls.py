@@ -19,6 +19,22 @@ class TestBlogApiUrls:
             == views.BlogSingleRetrieveUpdateDeleteAPIView
         )
 
+    def test_blog_post_comments_api_url(self):
+        url = reverse("blog:api-v1:post-comments", kwargs={"pk": 1})
+        assert resolve(url).func.view_class == views.PostCommentListAPIView
+
+    def test_blog_post_bulk_api_url(self):
+        url = reverse("blog:api-v1:post-bulk")
+        assert resolve(url).func.view_class == views.BlogBulkCreateAPIView
+
+    def test_blog_post_export_api_url(self):
+        url = reverse("blog:api-v1:post-export")
+        assert resolve(url).func.view_class == views.BlogExportAPIView
+
+    def test_blog_metrics_api_url(self):
+        url = reverse("blog:api-v1:metrics")
+        assert resolve(url).func.view_class == views.BlogMetricsAPIView
+
     def test_category_api_url(self):
         url = reverse("blog:api-v1:category")
         assert (
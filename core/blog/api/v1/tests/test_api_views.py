@@ -1,13 +1,26 @@
+import json
+from base64 import urlsafe_b64encode
 from datetime import datetime
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-
-from ....models import Post
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+from ....caching import get_generation
+from ....keyset import COMMENT_ORDERING, InvalidCursor, KeysetPaginator
+from ....models import Post, Category, Comment
+from ....pagecache import get_group_versions
+from ....widgets import get_category_counts, get_post_widget
 from accounts.models import Profile
 
 
+def encode_cursor(payload):
+    return urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
 User = get_user_model()
 
 
@@ -49,6 +62,28 @@ def post_by_owner(owner_user):
     return post_obj, client_obj
 
 
+@pytest.fixture
+def many_posts(owner_user):
+    user_obj, _ = owner_user
+    author = Profile.objects.get(user=user_obj)
+    categories = [Category.objects.create(name=f"cat {i}") for i in range(3)]
+    posts = []
+    for i in range(10):
+        post = Post.objects.create(
+            author=author,
+            title=f"test title {i}",
+            content="test content",
+            status=True,
+            published_date=datetime.now(),
+        )
+        post.category.set(categories)
+        Comment.objects.create(
+            post=post, name="test", email="a@a.com", message="test"
+        )
+        posts.append(post)
+    return posts
+
+
 @pytest.mark.django_db
 class TestBlogApiViews:
     def test_blog_index_list_create_api_GET_anonymous_user(
@@ -61,6 +96,254 @@ class TestBlogApiViews:
         response = anonymous_user.get(url)
         assert response.status_code == 200
 
+    def test_blog_index_list_create_api_GET_query_budget(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogIndexListCreateAPIView does not run queries per post,
+        one aggregate for the validators, one COUNT, one SELECT for posts
+        with author and one for categories
+        """
+        url = reverse("blog:api-v1:post-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous_user.get(url)
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 4
+        assert len(queries) <= 4
+
+    def test_blog_index_list_create_api_GET_cached_count(
+        self, test_user, many_posts
+    ):
+        """
+        Test CustomPagination counts the posts once and reads the count
+        from the cache on the next pages
+        """
+        url = reverse("blog:api-v1:post-list")
+        response = test_user.get(url)
+        assert response.data["total posts"] == len(many_posts)
+        with CaptureQueriesContext(connection) as queries:
+            response = test_user.get(url, {"page": 2})
+        assert response.data["total posts"] == len(many_posts)
+        assert not any("COUNT(*)" in q["sql"] for q in queries)
+
+    def test_blog_single_RUT_api_GET_query_budget(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogSingleRetrieveUpdateDeleteAPIView prefetches categories
+        and loads a single page of comments with their count
+        """
+        url = reverse(
+            "blog:api-v1:post-single", kwargs={"pk": many_posts[0].id}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous_user.get(url)
+        assert response.status_code == 200
+        assert len(response.data["category"]) == 3
+        assert len(response.data["comment"]) == 1
+        assert len(queries) <= 5
+
+    def test_blog_index_list_create_api_GET_cursor_pagination(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test walking BlogIndexListCreateAPIView with cursor pagination
+        forward and backward without running a COUNT query
+        """
+        Post.objects.update(published_date=many_posts[0].published_date)
+        url = reverse("blog:api-v1:post-list") + "?pagination=cursor"
+        seen = []
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = anonymous_user.get(url)
+            assert response.status_code == 200
+            assert "total posts" not in response.data
+            assert not any("COUNT(*)" in q["sql"] for q in queries)
+            pages.append([post["id"] for post in response.data["results"]])
+            seen.extend(pages[-1])
+            url = response.data["links"]["next"]
+        expected = list(
+            Post.objects.order_by(
+                "-published_date", "-created_date", "id"
+            ).values_list("id", flat=True)
+        )
+        assert seen == expected
+        previous = anonymous_user.get(
+            anonymous_user.get(
+                reverse("blog:api-v1:post-list") + "?pagination=cursor"
+            ).data["links"]["next"]
+        ).data["links"]["previous"]
+        response = anonymous_user.get(previous)
+        assert [post["id"] for post in response.data["results"]] == pages[0]
+        assert response.data["links"]["previous"] is None
+
+    def test_blog_index_list_create_api_GET_invalid_cursor(
+        self, anonymous_user
+    ):
+        """
+        Test BlogIndexListCreateAPIView with a broken cursor
+        """
+        url = reverse("blog:api-v1:post-list")
+        for cursor in (
+            "broken",
+            # well formed, but not the types of the ordering fields
+            encode_cursor({"v": [1, 2, 3], "r": 0}),
+            encode_cursor({"v": ["2023-01-01", "2023-01-01", "1"], "r": 0}),
+        ):
+            response = anonymous_user.get(url, {"cursor": cursor})
+            assert response.status_code == 404
+        with pytest.raises(InvalidCursor):
+            KeysetPaginator(COMMENT_ORDERING, 10).decode_cursor(
+                encode_cursor({"v": [1, 2], "r": 0}), Comment
+            )
+
+    def test_blog_index_list_create_api_GET_search(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogIndexListCreateAPIView with ?search= parameter
+        """
+        url = reverse("blog:api-v1:post-list") + "?search=title 3"
+        response = anonymous_user.get(url)
+        assert response.status_code == 200
+        assert [post["id"] for post in response.data["results"]] == [
+            many_posts[3].id
+        ]
+
+    def test_blog_index_list_create_api_GET_cached_response(
+        self,
+        anonymous_user,
+        many_posts,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        Test anonymous GET of BlogIndexListCreateAPIView is served from the
+        cache and goes stale as soon as a post changes
+        """
+        url = reverse("blog:api-v1:post-list")
+        first = anonymous_user.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            second = anonymous_user.get(url)
+        # the ETag comes from the blog generation, no query at all
+        assert len(queries) == 0
+        assert second.data == first.data
+        assert anonymous_user.get(url + "?page=2").data != first.data
+
+        post = Post.objects.get(id=first.data["results"][0]["id"])
+        with django_capture_on_commit_callbacks(execute=True):
+            post.title = "changed title"
+            post.save()
+        response = anonymous_user.get(url)
+        assert response.data["results"][0]["title"] == "changed title"
+
+    def test_blog_category_list_create_api_GET_cache_invalidation(
+        self, anonymous_user, test_user, django_capture_on_commit_callbacks
+    ):
+        """
+        Test cached CategoryListCreateAPIView is refreshed after a new
+        Category is created
+        """
+        url = reverse("blog:api-v1:category")
+        assert anonymous_user.get(url).data == []
+        with django_capture_on_commit_callbacks(execute=True):
+            test_user.post(url, {"name": "test"})
+        assert len(anonymous_user.get(url).data) == 1
+
+    def test_blog_index_list_create_api_GET_conditional(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogIndexListCreateAPIView answers a matching If-None-Match
+        with 304 without any query
+        """
+        url = reverse("blog:api-v1:post-list")
+        etag = anonymous_user.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert len(queries) == 0
+
+    def test_blog_index_list_create_api_GET_no_last_modified(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogIndexListCreateAPIView sends no Last-Modified, a comment
+        changes the list (comment_count) without touching updated_date
+        """
+        url = reverse("blog:api-v1:post-list")
+        response = anonymous_user.get(url)
+        assert not response.has_header("Last-Modified")
+        since = "Fri, 01 Jan 2100 00:00:00 GMT"
+        response = anonymous_user.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200
+
+    def test_blog_single_RUT_api_GET_conditional(
+        self, anonymous_user, post_by_owner
+    ):
+        """
+        Test BlogSingleRetrieveUpdateDeleteAPIView answers a matching
+        If-None-Match with 304 and a changed post with 200
+        """
+        post, client = post_by_owner
+        url = reverse("blog:api-v1:post-single", kwargs={"pk": post.id})
+        etag = anonymous_user.get(url)["ETag"]
+        response = anonymous_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        client.patch(url, {"content": "test patch content"})
+        response = anonymous_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_blog_index_list_create_api_GET_skips_content_column(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogIndexListCreateAPIView does not select the content column
+        but still renders the snippet
+        """
+        url = reverse("blog:api-v1:post-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous_user.get(url)
+        post = response.data["results"][0]
+        assert "content" not in post
+        assert post["snippet"] == "test content"
+        for query in queries:
+            assert '"blog_post"."content"' not in query["sql"]
+
+    def test_blog_index_list_create_api_GET_sparse_fieldset(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogIndexListCreateAPIView with ?fields= and ?omit=
+        """
+        url = reverse("blog:api-v1:post-list")
+        response = anonymous_user.get(url + "?fields=id,title,content")
+        assert set(response.data["results"][0]) == {"id", "title", "content"}
+        response = anonymous_user.get(url + "?omit=category,author,snippet")
+        post = response.data["results"][0]
+        assert "category" not in post
+        assert "author" not in post
+        assert "snippet" not in post
+        assert "title" in post
+
+    def test_blog_single_RUT_api_GET_sparse_fieldset(
+        self, anonymous_user, many_posts
+    ):
+        """
+        Test BlogSingleRetrieveUpdateDeleteAPIView with ?omit= does not
+        load the omitted relations
+        """
+        url = reverse(
+            "blog:api-v1:post-single", kwargs={"pk": many_posts[0].id}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous_user.get(url + "?omit=comment,category")
+        assert response.status_code == 200
+        assert "comment" not in response.data
+        assert "category" not in response.data
+        assert "content" in response.data
+        assert not any("blog_comment" in q["sql"] for q in queries[1:])
+
     def test_blog_index_list_create_api_POST_anonymous_user(
         self, anonymous_user
     ):
@@ -269,6 +552,244 @@ class TestBlogApiViews:
         url = reverse("blog:api-v1:post-single", kwargs={"pk": post.id})
         response = client.delete(url)
         assert response.status_code == 204
+        # soft deleted, the purge task runs once the request is committed
+        assert not Post.objects.filter(pk=post.id).exists()
+        assert Post.all_objects.filter(pk=post.id).exists()
+        assert client.get(url).status_code == 404
+
+    def test_blog_single_RUT_api_GET_embeds_first_comment_page(
+        self, anonymous_user, post_by_owner
+    ):
+        """
+        Test BlogSingleRetrieveUpdateDeleteAPIView embeds only the first
+        page of comments with the total count and a next link
+        """
+        post, _ = post_by_owner
+        for i in range(15):
+            Comment.objects.create(
+                post=post, name=f"{i}", email="a@a.com", message="test"
+            )
+        url = reverse("blog:api-v1:post-single", kwargs={"pk": post.id})
+        response = anonymous_user.get(url)
+        assert len(response.data["comment"]) == 10
+        assert response.data["comment_count"] == 15
+        response = anonymous_user.get(response.data["comment_next"])
+        assert response.status_code == 200
+        assert [c["name"] for c in response.data["results"]] == [
+            str(i) for i in range(4, -1, -1)
+        ]
+        assert response.data["links"]["next"] is None
+
+    def test_post_comment_list_api_GET(self, anonymous_user, post_by_owner):
+        """
+        Test PostCommentListAPIView walks every comment once
+        """
+        post, _ = post_by_owner
+        for i in range(25):
+            Comment.objects.create(
+                post=post, name=f"{i}", email="a@a.com", message="test"
+            )
+        Comment.objects.update(updated_date=post.updated_date)
+        url = reverse("blog:api-v1:post-comments", kwargs={"pk": post.id})
+        names = []
+        while url:
+            response = anonymous_user.get(url)
+            assert response.status_code == 200
+            names.extend(c["name"] for c in response.data["results"])
+            url = response.data["links"]["next"]
+        assert names == [str(i) for i in range(24, -1, -1)]
+
+    def test_post_comment_list_api_GET_not_existing_post(
+        self, anonymous_user
+    ):
+        """
+        Test PostCommentListAPIView with a post that does not exist
+        """
+        url = reverse("blog:api-v1:post-comments", kwargs={"pk": 1000})
+        response = anonymous_user.get(url)
+        assert response.status_code == 404
+
+    def test_blog_bulk_create_api_POST_anonymous_user(self, anonymous_user):
+        """
+        Test BlogBulkCreateAPIView by POST method with anonymous user
+        """
+        url = reverse("blog:api-v1:post-bulk")
+        response = anonymous_user.post(url, [], format="json")
+        assert response.status_code == 401
+
+    def test_blog_bulk_create_api_POST_logged_user_valid_data(
+        self, test_user
+    ):
+        """
+        Test BlogBulkCreateAPIView creates every post and its categories
+        with a fixed number of queries
+        """
+        categories = [Category.objects.create(name=f"c{i}") for i in range(2)]
+        url = reverse("blog:api-v1:post-bulk")
+        data = [
+            {
+                "title": f"bulk title {i}",
+                "content": "bulk content",
+                "published_date": datetime.now().isoformat(),
+                "category": [category.id for category in categories],
+            }
+            for i in range(5)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = test_user.post(url, data, format="json")
+        assert response.status_code == 201
+        assert [item["title"] for item in response.data] == [
+            item["title"] for item in data
+        ]
+        assert Post.objects.filter(title__startswith="bulk").count() == 5
+        assert Post.category.through.objects.count() == 10
+        assert [c.post_count for c in Category.objects.order_by("id")] == [
+            5,
+            5,
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            # plus one counter update per category
+            assert len(queries) <= 6 + len(categories)
+
+    def test_blog_bulk_create_api_POST_bulk_insert_invalidates_caches(
+        self, test_user, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        """
+        Test BlogBulkCreateAPIView drops every cache the post signals would
+        have dropped when the posts are bulk inserted without signals
+        """
+        # the PostgreSQL path on SQLite, one insert per row to get the ids
+        original = QuerySet.bulk_create
+
+        def bulk_create(self, objs, *args, **kwargs):
+            for obj in objs:
+                original(self, [obj])
+                obj.pk = self.model._base_manager.latest("pk").pk
+            return objs
+
+        monkeypatch.setattr(QuerySet, "bulk_create", bulk_create)
+        monkeypatch.setattr(
+            connection.features, "can_return_rows_from_bulk_insert", True
+        )
+        saved = []
+        monkeypatch.setattr(
+            Post, "save", lambda *args, **kwargs: saved.append(args)
+        )
+        category = Category.objects.create(name="category")
+        assert get_category_counts() == []
+        assert get_post_widget("latest_posts") == []
+        groups = ["posts", "sidebar"]
+        before = get_group_versions(groups)
+        generation = get_generation()
+        url = reverse("blog:api-v1:post-bulk")
+        data = [
+            {
+                "title": "bulk title",
+                "content": "bulk content",
+                "published_date": datetime.now().isoformat(),
+                "category": [category.id],
+            }
+        ]
+        with django_capture_on_commit_callbacks(execute=True):
+            response = test_user.post(url, data, format="json")
+        assert response.status_code == 201
+        assert not saved
+        assert get_generation() != generation
+        after = get_group_versions(groups)
+        assert all(new > old for old, new in zip(before, after))
+        assert get_category_counts() == [("category", "category", 1)]
+        assert [p["title"] for p in get_post_widget("latest_posts")] == [
+            "bulk title"
+        ]
+
+    def test_blog_bulk_create_api_POST_duplicate_categories(self, test_user):
+        """
+        Test BlogBulkCreateAPIView adds and counts a category given twice
+        for a post once
+        """
+        category = Category.objects.create(name="category")
+        url = reverse("blog:api-v1:post-bulk")
+        data = [
+            {
+                "title": "bulk title",
+                "content": "bulk content",
+                "published_date": datetime.now().isoformat(),
+                "category": [category.id, category.id],
+            }
+        ]
+        response = test_user.post(url, data, format="json")
+        assert response.status_code == 201
+        assert Post.category.through.objects.count() == 1
+        category.refresh_from_db()
+        assert category.post_count == 1
+
+    def test_blog_bulk_create_api_POST_logged_user_invalid_data(
+        self, test_user
+    ):
+        """
+        Test BlogBulkCreateAPIView rejects the whole batch and reports the
+        errors per item
+        """
+        url = reverse("blog:api-v1:post-bulk")
+        data = [
+            {
+                "title": "bulk title",
+                "content": "bulk content",
+                "published_date": datetime.now().isoformat(),
+            },
+            {"title": "bulk title", "category": [1000]},
+        ]
+        response = test_user.post(url, data, format="json")
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert "category" in response.data[1]
+        assert "content" in response.data[1]
+        assert not Post.objects.exists()
+
+    def test_blog_export_api_GET_test_user(self, test_user):
+        """
+        Test BlogExportAPIView is not available for a normal user
+        """
+        url = reverse("blog:api-v1:post-export")
+        response = test_user.get(url)
+        assert response.status_code == 403
+
+    def test_blog_export_api_GET_admin_user(self, many_posts):
+        """
+        Test BlogExportAPIView streams published posts as NDJSON and
+        supports incremental exports with ?since=
+        """
+        admin = User.objects.create(email="admin@admin.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        url = reverse("blog:api-v1:post-export")
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).splitlines()
+        assert len(lines) == len(many_posts)
+
+        since = many_posts[-1].updated_date.isoformat()
+        response = client.get(url, {"since": since})
+        lines = b"".join(response.streaming_content).splitlines()
+        assert len(lines) == 1
+        for since in ("yesterday", "2020-13-45T00:00:00"):
+            response = client.get(url, {"since": since})
+            assert response.status_code == 400
+
+    def test_blog_metrics_api_GET(self, test_user):
+        """
+        Test BlogMetricsAPIView shows the counters to admin users only
+        """
+        url = reverse("blog:api-v1:metrics")
+        assert test_user.get(url).status_code == 403
+        admin = User.objects.create(email="admin@admin.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data["search_cache_hits"] == 0
+        assert response.data["db_connections_reused"] == 0
 
     def test_blog_category_list_create_api_GET_anonymous_user(
         self, anonymous_user
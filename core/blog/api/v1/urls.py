@@ -12,6 +12,22 @@ urlpatterns = [
         views.BlogSingleRetrieveUpdateDeleteAPIView.as_view(),
         name="post-single",
     ),
+    path(
+        "<int:pk>/comments/",
+        views.PostCommentListAPIView.as_view(),
+        name="post-comments",
+    ),
+    path(
+        "bulk/",
+        views.BlogBulkCreateAPIView.as_view(),
+        name="post-bulk",
+    ),
+    path(
+        "export/",
+        views.BlogExportAPIView.as_view(),
+        name="post-export",
+    ),
+    path("metrics/", views.BlogMetricsAPIView.as_view(), name="metrics"),
     path(
         "category/",
         views.CategoryListCreateAPIView.as_view(),
@@ -1,31 +1,88 @@
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework import generics, status, views
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import (
+    IsAdminUser,
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
+from rest_framework.response import Response
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from ...models import Post, Category
-from .serializers import PostSerializer, CategorySerializer
+from ...models import Post, Category, Comment
+from ...exports import iter_ndjson, iter_published_posts
+from ...metrics import get_metrics
+from ...conditional import (
+    ConditionalGetMixin,
+    post_detail_validators,
+    post_list_validators,
+)
+from .serializers import (
+    CategorySerializer,
+    CommentSerializer,
+    PostSerializer,
+)
 from .permissions import IsOwnerOrReadOnly
-from .paginations import CustomPagination
+from .filters import PostSearchFilter
+from .mixins import CachedResponseMixin, SparsePostQuerysetMixin
+from .paginations import (
+    CommentCursorPagination,
+    CustomPagination,
+    PostCursorPagination,
+)
 
 
-class BlogIndexListCreateAPIView(generics.ListCreateAPIView):
+class BlogIndexListCreateAPIView(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    SparsePostQuerysetMixin,
+    generics.ListCreateAPIView,
+):
     """
     Class that show the list of all published posts or create new post in API.
+    Passing ?pagination=cursor switches to keyset pagination, which skips
+    the COUNT query and keeps deep pages as cheap as the first one.
+    ?fields= and ?omit= select the rendered fields, content is left out of
+    the list by default.
     """
 
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = PostSerializer
     queryset = Post.objects.filter(status=True)
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["author", "category"]
+    filter_backends = [DjangoFilterBackend, PostSearchFilter, OrderingFilter]
+    filterset_fields = ["author", "category", "category__slug"]
     search_fields = ["title", "content"]
     ordering_fields = ["published_date"]
     pagination_class = CustomPagination
 
+    @property
+    def paginator(self):
+        """
+        Choosing between page number and cursor pagination per request.
+        """
+        if not hasattr(self, "_paginator"):
+            if self.request is not None and PostCursorPagination.is_requested(
+                self.request
+            ):
+                self._paginator = PostCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_validators(self):
+        return post_list_validators()
+
 
 class BlogSingleRetrieveUpdateDeleteAPIView(
-    generics.RetrieveUpdateDestroyAPIView
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    SparsePostQuerysetMixin,
+    generics.RetrieveUpdateDestroyAPIView,
 ):
     """
     Class that retrieve a single published post or update or delete it in API.
@@ -34,9 +91,133 @@ class BlogSingleRetrieveUpdateDeleteAPIView(
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = PostSerializer
     queryset = Post.objects.filter(status=True)
+    detail = True
+
+    def get_validators(self):
+        return post_detail_validators(self.kwargs["pk"])
+
+    def perform_destroy(self, instance):
+        # its comments are purged in the background
+        instance.soft_delete()
+
+
+class PostCommentListAPIView(
+    ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView
+):
+    """
+    Class that show the comments of a published post in API, newest first
+    with keyset pagination.
+    """
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    serializer_class = CommentSerializer
+    pagination_class = CommentCursorPagination
+
+    def get_queryset(self):
+        post = get_object_or_404(Post, pk=self.kwargs["pk"], status=True)
+        return Comment.objects.filter(post=post)
+
+    def get_validators(self):
+        return post_detail_validators(self.kwargs["pk"])
 
 
-class CategoryListCreateAPIView(generics.ListCreateAPIView):
+class BlogBulkCreateAPIView(generics.CreateAPIView):
+    """
+    Class that create a batch of posts from a JSON array in API, all posts
+    are validated first and inserted in one transaction.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = PostSerializer
+    max_batch_size = 100
+
+    def get_serializer_context(self):
+        """
+        Loading every category used by the batch with one query.
+        """
+        context = super().get_serializer_context()
+        data = self.request.data if isinstance(self.request.data, list) else []
+        ids = set()
+        for item in data:
+            categories = item.get("category") if isinstance(item, dict) else []
+            if isinstance(categories, list):
+                ids.update(str(pk) for pk in categories)
+        context["categories"] = Category.objects.in_bulk(
+            [pk for pk in ids if pk.isdigit()]
+        )
+        return context
+
+    def create(self, request, *args, **kwargs):
+        if (
+            isinstance(request.data, list)
+            and len(request.data) > self.max_batch_size
+        ):
+            raise ValidationError(
+                f"Ensure this list has no more than "
+                f"{self.max_batch_size} posts."
+            )
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        posts = serializer.save()
+        results = [
+            {
+                "index": index,
+                "id": post.id,
+                "relative_path": request.build_absolute_uri(
+                    reverse("blog:api-v1:post-single", kwargs={"pk": post.id})
+                ),
+                "title": post.title,
+                "status": post.status,
+            }
+            for index, post in enumerate(posts)
+        ]
+        return Response(results, status=status.HTTP_201_CREATED)
+
+
+class BlogExportAPIView(views.APIView):
+    """
+    Class that stream every published post as newline delimited JSON in
+    API, ?since=<updated_date> only exports posts changed since then.
+    """
+
+    permission_classes = [IsAdminUser]
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+        if since:
+            try:
+                # None when malformed, ValueError for an impossible date
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise ValidationError({"since": "Enter a valid date/time."})
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        rows = iter_published_posts(since=since, chunk_size=self.chunk_size)
+        return StreamingHttpResponse(
+            iter_ndjson(rows), content_type="application/x-ndjson"
+        )
+
+
+class BlogMetricsAPIView(views.APIView):
+    """
+    Class that show the cache and database connection counters of the blog
+    in API, see blog.metrics.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_metrics())
+
+
+class CategoryListCreateAPIView(
+    CachedResponseMixin, generics.ListCreateAPIView
+):
     """
     Class that show the list of all Categories or create new Category in API.
     """
@@ -45,5 +226,5 @@ class CategoryListCreateAPIView(generics.ListCreateAPIView):
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
     filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ["name"]
+    filterset_fields = ["name", "slug"]
     search_fields = ["name"]
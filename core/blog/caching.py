@@ -0,0 +1,59 @@
+import time
+from hashlib import md5
+
+from django.core.cache import cache
+
+from core.routers import note_cache_invalidation
+
+
+GENERATION_KEY = "blog:generation"
+
+
+def _new_generation():
+    # a time based start value, so a lost counter never reuses old versions
+    return int(time.time() * 1000)
+
+
+def get_generation():
+    """
+    Return the current blog content generation, every cached blog
+    response is stored under this version.
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _new_generation(), None)
+        generation = cache.get(GENERATION_KEY, _new_generation())
+    return generation
+
+
+def bump_generation():
+    """
+    Make every entry of the previous generation stale at once.
+    """
+    note_cache_invalidation()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        generation = _new_generation()
+        cache.set(GENERATION_KEY, generation, None)
+        return generation
+
+
+def make_key(prefix, *parts):
+    """
+    Build a short cache key out of arbitrary parts.
+    """
+    digest = md5("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f"blog:{prefix}:{digest}"
+
+
+def widget_key(name):
+    return f"blog:widget:{name}"
+
+
+def delete_widget(name):
+    """
+    Drop a cached sidebar widget, the next render rebuilds it.
+    """
+    note_cache_invalidation()
+    cache.delete(widget_key(name))
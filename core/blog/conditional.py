@@ -0,0 +1,106 @@
+from hashlib import md5
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    quote_etag,
+)
+from django.utils.http import http_date
+
+from .caching import get_generation
+from .models import Post
+
+
+def post_list_validators():
+    """
+    Return (etag parts, None) of the post lists without a query, the
+    blog generation of the ETag (see ConditionalGetMixin) changes with
+    every post, category and comment.
+
+    No Last-Modified is sent, lists show comment counts and sidebar data
+    that change without touching the updated_date of a post.
+    """
+    return [], None
+
+
+def post_detail_validators(pk):
+    """
+    Return (etag parts, None) of a published post and its comments with
+    one aggregate query, (None, None) if there is no post.
+
+    No Last-Modified is sent, deleting the newest comment or changing the
+    categories or sidebar of the page does not move any updated_date
+    forward, the ETag (with the blog generation) covers them.
+    """
+    data = (
+        Post.objects.filter(pk=pk, status=True)
+        .order_by()
+        .aggregate(
+            post_modified=Max("updated_date"),
+            comment_modified=Max("comment__updated_date"),
+            comments=Count("comment"),
+        )
+    )
+    if data["post_modified"] is None:
+        return None, None
+    return [
+        data["post_modified"],
+        data["comment_modified"],
+        data["comments"],
+    ], None
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag and Last-Modified headers to GET responses and answer
+    matching If-None-Match / If-Modified-Since requests with 304 before
+    the view does any serialization or template rendering.
+    """
+
+    def get_validators(self):
+        """
+        Return (etag parts, last modified datetime) for the current
+        request, or (None, None) to skip conditional handling.
+        """
+        raise NotImplementedError
+
+    def get_etag_parts(self, request):
+        # the page also depends on who is asking, the representation and
+        # the sidebar widgets, which are covered by the blog generation
+        return [
+            request.build_absolute_uri(),
+            request.user.pk,
+            request.META.get("HTTP_ACCEPT", ""),
+            get_generation(),
+        ]
+
+    def get(self, request, *args, **kwargs):
+        # pending messages have to be rendered, never answer with a 304
+        if len(messages.get_messages(request)):
+            return super().get(request, *args, **kwargs)
+        parts, last_modified = self.get_validators()
+        if parts is None:
+            return super().get(request, *args, **kwargs)
+
+        parts += self.get_etag_parts(request)
+        etag = quote_etag(
+            md5("|".join(str(part) for part in parts).encode()).hexdigest()
+        )
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        if timestamp is not None and not response.has_header(
+            "Last-Modified"
+        ):
+            response["Last-Modified"] = http_date(timestamp)
+        if not response.has_header("ETag"):
+            response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
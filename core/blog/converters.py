@@ -0,0 +1,13 @@
+class UnicodeSlugConverter:
+    """
+    Like the slug path converter, for the allow_unicode slugs of
+    Category.
+    """
+
+    regex = r"[-\w]+"
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
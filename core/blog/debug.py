@@ -0,0 +1,81 @@
+import sys
+import warnings
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.template.base import Template
+
+
+class LazyRelationLoadWarning(RuntimeWarning):
+    pass
+
+
+QUERYSET_FILE = QuerySet._fetch_all.__code__.co_filename
+TEMPLATE_FILE = Template.render.__code__.co_filename
+
+
+def _find_lazy_load(frame):
+    """
+    Return (related object, template name) if the query running in this
+    stack loads a relation of a model instance during template rendering.
+    Related managers and descriptors mark their querysets with an
+    `instance` hint, prefetched or select_related relations never query.
+    """
+    # only the locals of the queryset and template frames are read,
+    # f_locals of arbitrary frames is not side effect free
+    instance = template = None
+    while frame is not None and template is None:
+        code = frame.f_code
+        if code.co_filename == QUERYSET_FILE:
+            if code.co_name == "prefetch_one_level":
+                # the prefetch_related() query itself
+                return None
+            if instance is None and code.co_name == "_fetch_all":
+                instance = frame.f_locals["self"]._hints.get("instance")
+        elif code.co_filename == TEMPLATE_FILE and code.co_name == "render":
+            local_self = frame.f_locals.get("self")
+            if isinstance(local_self, Template):
+                template = local_self
+        frame = frame.f_back
+    if instance is None or template is None:
+        return None
+    return instance, template.origin.template_name or "a template"
+
+
+def _warn_lazy_load(execute, sql, params, many, context):
+    found = _find_lazy_load(sys._getframe(1))
+    if found is not None:
+        instance, template_name = found
+        warnings.warn(
+            # no repr(), __str__ of the instance may load relations too
+            f"{template_name} loaded a relation of "
+            f"{type(instance).__name__} {instance.pk} lazily, "
+            f"add it to select_related() or prefetch_related(): {sql}",
+            LazyRelationLoadWarning,
+            stacklevel=2,
+        )
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def warn_lazy_relation_loads(using="default"):
+    """
+    Warn about every relation a template loads lazily inside the block.
+    """
+    with connections[using].execute_wrapper(_warn_lazy_load):
+        yield
+
+
+class LazyRelationLoadMiddleware:
+    """
+    Development only middleware (added when DEBUG is on) that warns when a
+    template triggers a lazy relation load, the n+1 queries of list pages.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with warn_lazy_relation_loads():
+            return self.get_response(request)
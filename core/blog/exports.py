@@ -0,0 +1,64 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Post
+
+
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "image",
+    "status",
+    "published_date",
+    "created_date",
+    "updated_date",
+    "author__user__email",
+)
+
+
+def iter_published_posts(since=None, chunk_size=2000):
+    """
+    Yield every published post as a dict, oldest change first.
+
+    Rows are read with a server-side cursor and the categories are loaded
+    with one query per chunk, so memory use does not depend on the size
+    of the table. `since` limits the export to posts updated at or after
+    that datetime for incremental syncs.
+    """
+    posts = Post.objects.filter(status=True)
+    if since is not None:
+        posts = posts.filter(updated_date__gte=since)
+    rows = posts.order_by("updated_date", "id").values(*EXPORT_FIELDS)
+
+    chunk = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _with_categories(chunk)
+            chunk = []
+    if chunk:
+        yield from _with_categories(chunk)
+
+
+def _with_categories(rows):
+    through = Post.category.through
+    categories = {}
+    pairs = through.objects.filter(
+        post_id__in=[row["id"] for row in rows]
+    ).values_list("post_id", "category__name")
+    for post_id, name in pairs:
+        categories.setdefault(post_id, []).append(name)
+    for row in rows:
+        row["author"] = row.pop("author__user__email")
+        row["category"] = categories.get(row["id"], [])
+        yield row
+
+
+def iter_ndjson(rows):
+    """
+    Encode every row as one line of JSON.
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
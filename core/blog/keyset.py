@@ -0,0 +1,158 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# (field name, descending) orderings of the keyset paginated models,
+# Meta.ordering plus id to make every row position unique
+POST_ORDERING = (
+    ("published_date", True),
+    ("created_date", True),
+    ("id", False),
+)
+COMMENT_ORDERING = (("updated_date", True), ("id", True))
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    """
+    One page of a keyset paginated queryset.
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) paginator.
+
+    Instead of COUNT + OFFSET every page is fetched with a WHERE clause on
+    the boundary row of the previous page, so the cost of a page does not
+    depend on how deep it is. The cursor is an opaque base64 string that
+    holds the ordering values of the boundary row and the direction.
+
+    `ordering` is a sequence of (field name, descending) pairs and should
+    end with a unique field, the fields have to be datetime or integer
+    fields.
+    """
+
+    def __init__(self, ordering, page_size):
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    def paginate(self, queryset, cursor=None):
+        """
+        Return the KeysetPage after (or before) the given cursor.
+        """
+        values, reverse = None, False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor, queryset.model)
+            queryset = queryset.filter(
+                self.get_keyset_filter(values, reverse)
+            )
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return KeysetPage(
+            results,
+            self.encode_cursor(results[-1]) if has_next and results else None,
+            (
+                self.encode_cursor(results[0], reverse=True)
+                if has_previous and results
+                else None
+            ),
+        )
+
+    def get_ordering(self, reverse=False):
+        """
+        Return the order_by() arguments, flipped when walking backwards.
+        """
+        return [
+            ("-" if descending != reverse else "") + field
+            for field, descending in self.ordering
+        ]
+
+    def get_keyset_filter(self, values, reverse=False):
+        """
+        Build the row comparison (a, b, c) > (x, y, z) as an OR of
+        prefix equalities, honoring the direction of every column.
+        """
+        keyset = Q()
+        for index, (field, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != reverse else "gt"
+            condition = {
+                prev_field: values[prev_index]
+                for prev_index, (prev_field, _) in enumerate(
+                    self.ordering[:index]
+                )
+            }
+            condition[f"{field}__{lookup}"] = values[index]
+            keyset |= Q(**condition)
+        return keyset
+
+    def encode_cursor(self, obj, reverse=False):
+        values = []
+        for field, _ in self.ordering:
+            value = getattr(obj, field)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            values.append(value)
+        payload = json.dumps({"v": values, "r": int(reverse)})
+        return urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor, model):
+        """
+        Return (values, reverse) out of a cursor or raise InvalidCursor,
+        every value is checked against its field of the model.
+        """
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode("ascii")))
+            raw_values = payload["v"]
+            reverse = bool(payload["r"])
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = []
+            for (field, _), value in zip(self.ordering, raw_values):
+                field = model._meta.get_field(field)
+                if isinstance(field, models.DateTimeField):
+                    if not isinstance(value, str):
+                        raise ValueError
+                    value = parse_datetime(value)
+                    if value is None:
+                        raise ValueError
+                elif type(value) is not int:
+                    # bool is an int too
+                    raise ValueError
+                values.append(value)
+        except (
+            BinasciiError,
+            KeyError,
+            TypeError,
+            ValueError,
+            UnicodeError,
+        ):
+            raise InvalidCursor(cursor)
+        return values, reverse
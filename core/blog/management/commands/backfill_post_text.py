@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from blog.caching import bump_generation
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Compute excerpt, word count and reading time of existing posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="number of posts loaded and updated at once",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        fields = ["excerpt", "word_count", "reading_time"]
+        last_id = 0
+        total = 0
+        while True:
+            posts = list(
+                Post.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "content")[:chunk_size]
+            )
+            if not posts:
+                break
+            for post in posts:
+                post.update_text_fields()
+            Post.objects.bulk_update(posts, fields)
+            last_id = posts[-1].id
+            total += len(posts)
+            self.stdout.write(f"{total} post(s) updated...")
+
+        if total:
+            bump_generation()
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully updated {total} post(s)!")
+        )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.routers import replica_reads
+from blog.exports import iter_ndjson, iter_published_posts
+
+
+class Command(BaseCommand):
+    help = "Export published posts as newline delimited JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="only export posts updated at or after this date/time",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="number of rows fetched from the database at once",
+        )
+        parser.add_argument(
+            "-o", "--output", help="file to write to (default is stdout)"
+        )
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        if since:
+            try:
+                # None when malformed, ValueError for an impossible date
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise CommandError("--since is not a valid date/time")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        # a long read only scan, keep it off the primary when possible
+        with replica_reads():
+            rows = iter_published_posts(
+                since=since, chunk_size=options["chunk_size"]
+            )
+            if options["output"]:
+                with open(options["output"], "w") as output:
+                    count = self.write(output, rows)
+                self.stderr.write(
+                    self.style.SUCCESS(
+                        f"Successfully exported {count} post(s) to "
+                        f"{options['output']}."
+                    )
+                )
+            else:
+                self.write(self.stdout, rows)
+
+    def write(self, output, rows):
+        count = 0
+        for line in iter_ndjson(rows):
+            output.write(line)
+            count += 1
+        return count
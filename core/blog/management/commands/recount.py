@@ -0,0 +1,95 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.caching import bump_generation, delete_widget
+from blog.models import Category, Comment, Post
+from blog.pagecache import purge_groups
+
+
+def comment_count():
+    comments = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(comments), 0)
+
+
+def post_count():
+    posts = (
+        Post.category.through.objects.filter(
+            category=OuterRef("pk"), post__status=True
+        )
+        .order_by()
+        .values("category")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(posts), 0)
+
+
+class Command(BaseCommand):
+    help = "Repair the comment counts of posts and post counts of categories"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="number of rows checked and updated at once",
+        )
+
+    def recount(self, model, field, count, chunk_size):
+        """
+        Repair the drifted counters and return the ids of their rows.
+        """
+        last_id = 0
+        fixed = []
+        while True:
+            ids = list(
+                model.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            drifted = list(
+                model.objects.filter(id__in=ids)
+                .annotate(actual=count())
+                .exclude(**{field: F("actual")})
+                .values_list("id", flat=True)
+            )
+            if drifted:
+                model.objects.filter(id__in=drifted).update(
+                    **{field: count()}
+                )
+            last_id = ids[-1]
+            fixed += drifted
+        return fixed
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        posts = self.recount(Post, "comment_count", comment_count, chunk_size)
+        self.stdout.write(f"{len(posts)} post comment count(s) fixed...")
+        categories = self.recount(
+            Category, "post_count", post_count, chunk_size
+        )
+        self.stdout.write(
+            f"{len(categories)} category post count(s) fixed..."
+        )
+
+        if posts or categories:
+            bump_generation()
+            # the post cards and sidebars of cached pages show the counts
+            purge_groups("posts", *(f"post:{pk}" for pk in posts))
+        if categories:
+            delete_widget("categories")
+            purge_groups("sidebar")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully fixed {len(posts) + len(categories)} count(s)!"
+            )
+        )
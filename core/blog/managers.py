@@ -0,0 +1,41 @@
+from django.db import models
+
+
+class PostQuerySet(models.QuerySet):
+    """Creating QuerySet class for our Post model."""
+
+    # big columns that list pages never render
+    listing_deferred_fields = ("content", "search_vector")
+
+    def published(self):
+        """
+        Only the posts that are published.
+        """
+        return self.filter(status=True)
+
+    def with_relations(self):
+        """
+        Load what the post templates show next to every post, the author
+        with its user (Profile.__str__) and the categories.
+        """
+        return self.select_related("author__user").prefetch_related(
+            "category"
+        )
+
+    def for_listing(self):
+        """
+        Leave the rich text content out of the SELECT, list pages render
+        the precomputed excerpt instead, and load the relations of the
+        post cards.
+        """
+        return self.defer(*self.listing_deferred_fields).with_relations()
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    """
+    Default manager of Post, soft deleted posts are hidden from every
+    queryset until purge_post_task removes them, see Post.soft_delete().
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_date__isnull=True)
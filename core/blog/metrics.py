@@ -0,0 +1,37 @@
+from django.core.cache import cache
+
+
+# counters shown by the metrics endpoint, kept in the shared cache so
+# every worker process adds to the same numbers
+COUNTERS = (
+    "search_cache_hits",
+    "search_cache_misses",
+    # database connections of the core.postgresql backend
+    "db_connections_opened",
+    "db_connections_reused",
+    "db_connections_unusable",
+)
+
+
+def _counter_key(name):
+    return f"blog:metrics:{name}"
+
+
+def incr(name, delta=1):
+    """
+    Add delta to a counter of COUNTERS.
+    """
+    key = _counter_key(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def get_metrics():
+    """
+    Return {counter name: value} of every counter.
+    """
+    values = cache.get_many([_counter_key(name) for name in COUNTERS])
+    return {name: values.get(_counter_key(name), 0) for name in COUNTERS}
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:10
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION blog_post_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector(
+            'english', coalesce(NEW.title, '')
+        ), 'A') ||
+        setweight(to_tsvector(
+            'english',
+            regexp_replace(coalesce(NEW.content, ''), '<[^>]*>', ' ', 'g')
+        ), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS blog_post_search_vector_trigger ON blog_post;
+CREATE TRIGGER blog_post_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, content, search_vector ON blog_post
+FOR EACH ROW EXECUTE PROCEDURE blog_post_search_vector_update();
+
+UPDATE blog_post SET search_vector = NULL;
+
+CREATE INDEX IF NOT EXISTS blog_post_search_vector_gin
+ON blog_post USING gin (search_vector);
+"""
+
+DROP_TRIGGER_SQL = """
+DROP INDEX IF EXISTS blog_post_search_vector_gin;
+DROP TRIGGER IF EXISTS blog_post_search_vector_trigger ON blog_post;
+DROP FUNCTION IF EXISTS blog_post_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0008_alter_post_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:20
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def fill_slugs(apps, schema_editor):
+    # the model save() is not available here, same rules as utils.unique_slug
+    Category = apps.get_model("blog", "Category")
+    used = set()
+    for category in Category.objects.order_by("id").iterator():
+        base = slugify(category.name, allow_unicode=True) or "category"
+        slug, number = base, 1
+        while slug in used:
+            number += 1
+            slug = f"{base}-{number}"
+        used.add(slug)
+        category.slug = slug
+        category.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_post_text_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="slug",
+            field=models.SlugField(
+                allow_unicode=True, editable=False, max_length=255, null=True
+            ),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="category",
+            name="slug",
+            field=models.SlugField(
+                allow_unicode=True,
+                editable=False,
+                max_length=255,
+                unique=True,
+            ),
+        ),
+    ]
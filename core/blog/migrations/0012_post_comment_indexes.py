@@ -0,0 +1,71 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:17
+
+from django.db import migrations, models
+
+
+def _index_kwargs(schema_editor):
+    # CREATE/DROP INDEX CONCURRENTLY does not lock the table for writes
+    if schema_editor.connection.vendor == "postgresql":
+        return {"concurrently": True}
+    return {}
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex that builds the index concurrently on PostgreSQL and as a
+    plain index elsewhere (SQLite in DEBUG).
+    """
+
+    def database_forwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(
+                model, self.index, **_index_kwargs(schema_editor)
+            )
+
+    def database_backwards(
+        self, app_label, schema_editor, from_state, to_state
+    ):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(
+                model, self.index, **_index_kwargs(schema_editor)
+            )
+
+
+class Migration(migrations.Migration):
+
+    # concurrent index builds can not run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("blog", "0011_category_slug"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "-updated_date", "-id"],
+                name="blog_comment_post_updated_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", True)),
+                fields=["-published_date", "-created_date", "id"],
+                name="blog_post_published_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", False)),
+                fields=["published_date"],
+                name="blog_post_scheduled_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counts(apps, schema_editor):
+    # the same counts as the recount command, with the historical models
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+    Category = apps.get_model("blog", "Category")
+    comments = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Post.objects.update(comment_count=Coalesce(Subquery(comments), 0))
+    posts = (
+        Post.category.through.objects.filter(
+            category=OuterRef("pk"), post__status=True
+        )
+        .order_by()
+        .values("category")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Category.objects.update(post_count=Coalesce(Subquery(posts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0012_post_comment_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="post_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
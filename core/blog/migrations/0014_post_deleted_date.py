@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_post_comment_count_category_post_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="deleted_date",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
@@ -1,10 +1,47 @@
-from django.db import models
+from functools import partial
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 from ckeditor_uploader.fields import RichTextUploadingField
 from accounts.models import Profile
+from .caching import bump_generation, delete_widget
+from .managers import PostManager, PostQuerySet
+from .pagecache import get_purge_groups, purge_groups
+from .utils import text_summary, unique_slug
+
+
+class CounterFieldsMixin:
+    """
+    Never write the `counter_fields` back on save(), they are only changed
+    with F() updates and the loaded value may already be stale.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            skipped = set(self.counter_fields) | self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
 
 
-class Post(models.Model):
+class Post(CounterFieldsMixin, models.Model):
     """
     This is a table in our DB, Post is table name and below
     attributes are our field in our table.
@@ -22,28 +59,121 @@ class Post(models.Model):
     published_date = models.DateTimeField()
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
+    # derived from content on save, so list pages never load the content
+    excerpt = models.TextField(blank=True, default="", editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)
+    # maintained by a database trigger on PostgreSQL, see blog/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+    # maintained by the signals below, repaired by the recount command
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # set by soft_delete(), the row is gone once purge_post_task ran
+    deleted_date = models.DateTimeField(null=True, editable=False)
+
+    objects = PostManager()
+    # soft deleted posts included
+    all_objects = PostQuerySet.as_manager()
+    counter_fields = ("comment_count",)
+    # status stored in the database, see from_db()
+    _saved_status = False
 
     class Meta:
         ordering = ["-published_date", "-created_date"]
+        # built concurrently on PostgreSQL by migration 0012
+        indexes = [
+            # public listings and their keyset pagination
+            models.Index(
+                fields=["-published_date", "-created_date", "id"],
+                condition=models.Q(status=True),
+                name="blog_post_published_idx",
+            ),
+            # posts waiting for publish_posts_task
+            models.Index(
+                fields=["published_date"],
+                condition=models.Q(status=False),
+                name="blog_post_scheduled_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the status in the database, to tell (un)publishing on save
+        instance._saved_status = instance.__dict__.get("status", False)
+        return instance
+
     def get_absolute_url(self):
         return reverse("blog:single", kwargs={"pk": self.id})
 
     def get_snippet(self):
-        return self.content[:10]
+        return self.excerpt
+
+    def soft_delete(self):
+        """
+        Hide the post at once, unpublished for the counters, caches and
+        pages, and delete it with its comments in the background.
+        """
+        from .tasks import purge_post_task
+
+        self.status = False
+        self.deleted_date = timezone.now()
+        self.save(update_fields=["status", "deleted_date"])
+        transaction.on_commit(partial(purge_post_task.delay, self.pk))
 
+    def update_text_fields(self):
+        """
+        Compute excerpt, word count and reading time out of the content.
+        """
+        (
+            self.excerpt,
+            self.word_count,
+            self.reading_time,
+        ) = text_summary(
+            self.content,
+            settings.BLOG_EXCERPT_LENGTH,
+            settings.BLOG_READING_WORDS_PER_MINUTE,
+        )
 
-class Category(models.Model):
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.update_text_fields()
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {
+                    "excerpt",
+                    "word_count",
+                    "reading_time",
+                }
+        super().save(*args, **kwargs)
+
+
+class Category(CounterFieldsMixin, models.Model):
     """This is the Category table with name field in our database."""
 
     name = models.CharField(max_length=255)
+    slug = models.SlugField(
+        max_length=255, unique=True, allow_unicode=True, editable=False
+    )
+    # published posts of the category, maintained by the signals below
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    counter_fields = ("post_count",)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = unique_slug(
+                Category.objects.exclude(pk=self.pk), self.name
+            )
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """
@@ -59,9 +189,172 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-updated_date"]
+        indexes = [
+            # comments of a post and their keyset pagination
+            models.Index(
+                fields=["post", "-updated_date", "-id"],
+                name="blog_comment_post_updated_idx",
+            ),
+        ]
 
     def __str__(self):
         return "{} on {}".format(self.email, self.post.title)
 
     def get_absolute_url(self):
         return reverse("blog:single", kwargs={"pk": self.post.id})
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(m2m_changed, sender=Post.category.through)
+def invalidate_blog_cache(sender, **kwargs):
+    """
+    A signal that makes every cached blog response stale once the
+    transaction that changed the blog content is committed.
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Post.category.through)
+def invalidate_category_counts(sender, **kwargs):
+    """
+    A signal that drops the cached category sidebar when a post is
+    (un)published, removed or recategorized, or a category changes.
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    transaction.on_commit(partial(delete_widget, "categories"))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def refresh_post_widgets(sender, **kwargs):
+    """
+    A signal that rebuilds the cached post widgets in the background once
+    a published or edited post is committed.
+    """
+    from .widgets import schedule_widget_rebuild
+
+    transaction.on_commit(schedule_widget_rebuild)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(m2m_changed, sender=Post.category.through)
+def purge_cached_pages(sender, instance, **kwargs):
+    """
+    A signal that drops the cached html pages showing the changed post,
+    comment or category once the transaction is committed.
+    """
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    kind = {Post: "post", Category: "category", Comment: "comment"}[
+        type(instance)
+    ]
+    # formatted now, a deleted instance loses its id
+    groups = get_purge_groups(kind, instance)
+    transaction.on_commit(partial(purge_groups, *groups))
+
+
+def _add_to_counter(queryset, field, delta):
+    # F() keeps concurrent changes, Greatest() a drifted counter >= 0
+    if delta:
+        queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def _add_to_category_counts(post, delta, **filters):
+    _add_to_counter(
+        Category.objects.filter(post=post.pk, **filters), "post_count", delta
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_published_post(sender, instance, update_fields=None, **kwargs):
+    """
+    A signal that adds a (un)published post to the post counts of its
+    categories.
+    """
+    if update_fields is not None and "status" not in update_fields:
+        return
+    if instance.status != instance._saved_status:
+        _add_to_category_counts(instance, 1 if instance.status else -1)
+        instance._saved_status = instance.status
+
+
+@receiver(pre_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    """
+    A signal that removes a published post from the post counts of its
+    categories before its category rows are deleted.
+    """
+    # the status is read from the database, it may be deferred or changed
+    _add_to_category_counts(instance, -1, post__status=True)
+
+
+@receiver(m2m_changed, sender=Post.category.through)
+def count_categorized_posts(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    A signal that keeps the post counts of categories in step with the
+    categories of published posts.
+    """
+    if action == "pre_clear":
+        # the cleared rows are gone once post_clear is sent
+        if reverse:
+            instance._cleared_pks = set(
+                instance.post_set.values_list("pk", flat=True)
+            )
+        else:
+            instance._cleared_pks = set(
+                instance.category.values_list("pk", flat=True)
+            )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    delta = 1 if action == "post_add" else -1
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_pks", set())
+    if not pk_set:
+        return
+    if reverse:
+        # a category got posts, only the published ones count
+        published = Post.objects.filter(pk__in=pk_set, status=True).count()
+        _add_to_counter(
+            Category.objects.filter(pk=instance.pk),
+            "post_count",
+            delta * published,
+        )
+    elif instance.status:
+        _add_to_counter(
+            Category.objects.filter(pk__in=pk_set), "post_count", delta
+        )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def count_comments(sender, instance, created=False, **kwargs):
+    """
+    A signal that keeps the comment count of the post of a comment.
+    """
+    if kwargs["signal"] is post_save and not created:
+        return
+    _add_to_counter(
+        Post.objects.filter(pk=instance.post_id),
+        "comment_count",
+        1 if created else -1,
+    )
@@ -0,0 +1,158 @@
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from core.routers import note_cache_invalidation, primary_reads
+
+from .caching import make_key
+
+
+# url name -> purge groups the page depends on, formatted with the url
+# kwargs. Only these pages are cached.
+PAGE_GROUPS = {
+    "website:index": ("posts",),
+    "website:about": (),
+    "blog:index": ("posts", "sidebar"),
+    "blog:category": ("posts", "sidebar"),
+    "blog:single": ("post:{pk}", "sidebar"),
+}
+# changed model -> purge groups to drop, formatted with the instance
+PURGE_MAP = {
+    "post": ("post:{id}", "posts", "sidebar"),
+    # list pages show the comment count of every post card
+    "comment": ("post:{post_id}", "posts"),
+    "category": ("posts", "sidebar"),
+}
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def _group_key(group):
+    return f"blog:page-group:{group}"
+
+
+def get_group_versions(groups):
+    """
+    Return the current version of every purge group, missing ones are
+    started at 1.
+    """
+    keys = [_group_key(group) for group in groups]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, 1, None)
+            versions[key] = cache.get(key, 1)
+    return [versions[key] for key in keys]
+
+
+def purge_groups(*groups):
+    """
+    Drop every cached page of the given purge groups.
+    """
+    note_cache_invalidation()
+    for group in groups:
+        try:
+            cache.incr(_group_key(group))
+        except ValueError:
+            # nothing was cached for this group yet
+            pass
+
+
+def get_purge_groups(kind, instance):
+    """
+    Return the purge groups of the pages showing the changed instance,
+    see PURGE_MAP.
+    """
+    return [group.format_map(vars(instance)) for group in PURGE_MAP[kind]]
+
+
+def is_cacheable_request(request):
+    # pending messages are rendered into the page
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and not len(messages.get_messages(request))
+    )
+
+
+def get_page_key(request):
+    match = request.resolver_match
+    groups = [
+        group.format_map(match.kwargs)
+        for group in PAGE_GROUPS[match.view_name]
+    ]
+    query = sorted(request.GET.lists())
+    return make_key(
+        "page", request.path, query, *get_group_versions(groups)
+    )
+
+
+def _response_from_cache(request, cached):
+    content, headers = cached
+    etag = headers.get("ETag")
+    last_modified = parse_http_date_safe(headers.get("Last-Modified", ""))
+    response = None
+    if etag or last_modified:
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+    if response is None:
+        if CSRF_INPUT_RE.search(content):
+            # every visitor needs a token of its own csrf cookie
+            token = get_token(request).encode()
+            content = CSRF_INPUT_RE.sub(
+                rb"\g<1>" + token + rb"\g<2>", content
+            )
+        response = HttpResponse(content)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def _store(key, response):
+    # never share a response that sets something else than the csrf cookie
+    cookies = set(response.cookies) - {settings.CSRF_COOKIE_NAME}
+    if response.status_code != 200 or response.streaming or cookies:
+        return
+    headers = {
+        header: response[header]
+        for header in CACHED_HEADERS
+        if response.has_header(header)
+    }
+    cache.set(
+        key, (response.content, headers), settings.BLOG_PAGE_CACHE_TIMEOUT
+    )
+
+
+def cache_anonymous_page(view):
+    """
+    Serve the pages of PAGE_GROUPS to anonymous visitors without messages
+    from the cache, keyed by path, query string and the versions of the
+    purge groups of the page.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view(request, *args, **kwargs)
+        key = get_page_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return _response_from_cache(request, cached)
+
+        # rendered here, the whole page is read from the primary
+        with primary_reads():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response.render()
+        _store(key, response)
+        return response
+
+    return wrapper
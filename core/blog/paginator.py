@@ -0,0 +1,65 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+
+from core.routers import primary_reads
+
+from .caching import get_generation, make_key
+
+
+def estimate_count(queryset):
+    """
+    Return the PostgreSQL planner estimate of the rows of the queryset,
+    read from EXPLAIN (the reltuples statistics for a plain table scan),
+    or None on other databases.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that keeps the count of a queryset in the cache, keyed by
+    its SQL and stale with the blog generation, so paging does not run a
+    COUNT(*) on every request.
+
+    On PostgreSQL a queryset the planner estimates above
+    BLOG_PAGINATOR_ESTIMATE_THRESHOLD rows is not counted at all, the
+    estimate is used instead.
+    """
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        queryset = self.object_list
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        key = make_key("count", sql)
+        generation = get_generation()
+        count = cache.get(key, version=generation)
+        if count is None:
+            with primary_reads():
+                count = estimate_count(queryset)
+                if (
+                    count is None
+                    or count < settings.BLOG_PAGINATOR_ESTIMATE_THRESHOLD
+                ):
+                    count = super().count
+            cache.set(
+                key,
+                count,
+                settings.BLOG_COUNT_CACHE_TIMEOUT,
+                version=generation,
+            )
+        return count
@@ -1,5 +1,7 @@
 from django.contrib.auth.mixins import AccessMixin
 from django.contrib import messages
+from django.http import HttpResponseRedirect
+from django.urls import reverse
 
 
 class UserIsVerifiedMixin(AccessMixin):
@@ -12,3 +14,38 @@ class UserIsVerifiedMixin(AccessMixin):
             )
             return self.handle_no_permission()
         return super().dispatch(request, *args, **kwargs)
+
+
+def is_post_owner(post, user):
+    """
+    Return True if the user wrote the post, compared by ids so only the
+    author row (select_related) is needed, never the author's user.
+    """
+    return user.is_authenticated and post.author.user_id == user.id
+
+
+class PostOwnerRequiredMixin:
+    """
+    Load the post once, with its author, and redirect everyone but the
+    owner back to the blog index.
+    """
+
+    owner_required_message = (
+        "You can not change this post, "
+        "Every post only can be changed by its owner"
+    )
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("author")
+
+    def get_object(self, queryset=None):
+        # the generic views call get_object() again in get() and post()
+        if queryset is not None or not hasattr(self, "_post"):
+            self._post = super().get_object(queryset)
+        return self._post
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_post_owner(self.get_object(), request.user):
+            messages.error(request, self.owner_required_message)
+            return HttpResponseRedirect(reverse("blog:index"))
+        return super().dispatch(request, *args, **kwargs)
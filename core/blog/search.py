@@ -0,0 +1,132 @@
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+)
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F, Func, Q, TextField, Value
+
+from core.routers import primary_reads
+
+from . import metrics
+from .caching import get_generation, make_key
+
+
+# must match the config used by the trigger in migration 0009
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = {
+    "start_sel": "<mark>",
+    "stop_sel": "</mark>",
+    "max_words": 35,
+    "min_words": 15,
+    "max_fragments": 2,
+}
+
+
+def full_text_search_available(using="default"):
+    """
+    Full text search needs the tsvector column maintained by the
+    PostgreSQL trigger, other backends (SQLite in DEBUG) fall back to
+    LIKE lookups.
+    """
+    return connections[using].vendor == "postgresql"
+
+
+class StripTags(Func):
+    """
+    Remove html tags of the rich text content inside the database.
+    """
+
+    function = "regexp_replace"
+    output_field = TextField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(
+            expression, Value("<[^>]*>"), Value(" "), Value("g"), **extra
+        )
+
+
+def search_posts(queryset, query, fallback_lookups=("content__contains",)):
+    """
+    Filter the Post queryset by the query string.
+
+    On PostgreSQL the stored search_vector (GIN indexed) is matched with a
+    websearch query, results are ordered by relevance and every post gets
+    `rank` and a highlighted `headline` annotation. On other databases
+    the given fallback lookups are OR-ed together.
+    """
+    query = (query or "").strip()
+    if not query:
+        return queryset
+    if not full_text_search_available(queryset.db):
+        condition = Q()
+        for lookup in fallback_lookups:
+            condition |= Q(**{lookup: query})
+        return queryset.filter(condition)
+
+    search_query = SearchQuery(
+        query, config=SEARCH_CONFIG, search_type="websearch"
+    )
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            headline=SearchHeadline(
+                StripTags(F("content")),
+                search_query,
+                config=SEARCH_CONFIG,
+                **HEADLINE_OPTIONS,
+            ),
+        )
+        .order_by("-rank", "-published_date", "-created_date")
+    )
+
+
+def normalize_query(query, using="default"):
+    """
+    Return the cache key form of a search query.
+
+    On PostgreSQL it is the parsed tsquery, so queries that only differ in
+    case, whitespace, stop words or word endings share one entry. Other
+    databases get the case folded query with collapsed whitespace.
+    """
+    query = " ".join((query or "").split())
+    if not query or not full_text_search_available(using):
+        return query.casefold()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT websearch_to_tsquery(%s::regconfig, %s)::text",
+            [SEARCH_CONFIG, query],
+        )
+        return cursor.fetchone()[0]
+
+
+def search_post_ids(queryset, query, fallback_lookups=("content__contains",)):
+    """
+    Return the ids of the posts matching the query, best match first.
+
+    The list is cached for BLOG_SEARCH_CACHE_TIMEOUT seconds under the
+    normalized query, and goes stale with the blog generation, so paging
+    through the results runs the search only once.
+    """
+    query = " ".join((query or "").split())
+    key = make_key("search", normalize_query(query, queryset.db))
+    generation = get_generation()
+    ids = cache.get(key, version=generation)
+    if ids is not None:
+        metrics.incr("search_cache_hits")
+        return ids
+
+    metrics.incr("search_cache_misses")
+    with primary_reads():
+        ids = list(
+            search_posts(queryset, query, fallback_lookups).values_list(
+                "id", flat=True
+            )[: settings.BLOG_SEARCH_MAX_RESULTS]
+        )
+    cache.set(
+        key, ids, settings.BLOG_SEARCH_CACHE_TIMEOUT, version=generation
+    )
+    return ids
@@ -1,10 +1,13 @@
-from celery import shared_task, Celery
-from django.utils import timezone
-
-from .models import Post
+from datetime import timedelta
 
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
-app = Celery()
+from .models import Comment, Post
+from .pagecache import purge_groups
+from .widgets import REBUILD_PENDING_KEY, rebuild_post_widgets
 
 
 @shared_task
@@ -22,10 +25,58 @@ def publish_posts_task():
     )
 
 
-@app.on_after_finalize.connect
-def setup_periodic_tasks(sender, **kwargs):
-    sender.add_periodic_task(
-        60 * 60,
-        publish_posts_task().s(),
-        name="published posts every one hour",
+@shared_task
+def rebuild_widgets_task():
+    # clear the flag first, changes committed from now on queue a new run
+    cache.delete(REBUILD_PENDING_KEY)
+    rebuild_post_widgets()
+    # pages rendered between the commit and this rebuild show the old
+    # widgets under the new group versions
+    purge_groups("posts", "sidebar")
+
+
+def _delete_in_batches(queryset, batch_size):
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return
+        # no per row signals, the post is already hidden and unpublished
+        queryset.model.objects.filter(pk__in=ids)._raw_delete(queryset.db)
+
+
+@shared_task
+def purge_post_task(post_id):
+    """
+    Delete a soft deleted post, its comments and category rows in batches
+    of BLOG_PURGE_BATCH_SIZE so no statement holds locks for long, then
+    the post and its image file.
+    """
+    post = Post.all_objects.filter(
+        pk=post_id, deleted_date__isnull=False
+    ).first()
+    if post is None:
+        return
+    batch_size = settings.BLOG_PURGE_BATCH_SIZE
+    _delete_in_batches(Comment.objects.filter(post_id=post_id), batch_size)
+    _delete_in_batches(
+        Post.category.through.objects.filter(post_id=post_id), batch_size
+    )
+    image = post.image
+    post.delete()
+    default = Post._meta.get_field("image").default
+    if (
+        image
+        and image.name != default
+        and not Post.all_objects.filter(image=image.name).exists()
+    ):
+        image.storage.delete(image.name)
+
+
+@shared_task
+def purge_deleted_posts_task():
+    # soft deleted posts whose purge task was lost
+    posts = Post.all_objects.filter(
+        deleted_date__lte=timezone.now() - timedelta(hours=1)
     )
+    for post_id in posts.values_list("pk", flat=True):
+        purge_post_task.delay(post_id)
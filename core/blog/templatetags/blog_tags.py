@@ -1,5 +1,5 @@
 from django import template
-from blog.models import Category, Post
+from blog.widgets import get_category_counts, get_post_widget
 
 
 register = template.Library()
@@ -7,27 +7,15 @@ register = template.Library()
 
 @register.inclusion_tag("blog/blog-categories.html")
 def categories_tag():
-    posts = Post.objects.filter(status=True)
-    categories = Category.objects.all()
-    cat_counter = {}
-    for name in categories:
-        count = posts.filter(category__name=name).count()
-        if count > 0:
-            cat_counter[name] = count
-
-    return {"cat_counter": cat_counter}
+    return {"categories": get_category_counts()}
 
 
 @register.inclusion_tag("blog/blog-top-stories.html")
 def top_stories_tag():
-    posts = Post.objects.filter(status=True)
-    if posts.count() > 2:
-        return {"posts": posts[posts.count() - 2:]}
-    else:
-        return {"posts": posts}
+    return {"posts": get_post_widget("top_stories")}
 
 
 @register.inclusion_tag("blog/blog-recent-post.html")
 def recent_post_tag():
-    post = Post.objects.filter(status=True).first()
-    return {"post": post}
+    posts = get_post_widget("recent_post")
+    return {"post": posts[0] if posts else None}
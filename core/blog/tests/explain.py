@@ -0,0 +1,25 @@
+from django.db import connections, transaction
+
+
+def get_plan(queryset):
+    """
+    Return the EXPLAIN output of the queryset. On PostgreSQL sequential
+    scans are disabled for the statement, a small seeded table would be
+    read sequentially even when a usable index exists.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def assert_uses_index(queryset, index_name):
+    """
+    Assert the database reads the queryset through the given index, the
+    plans only name the indexes they scan.
+    """
+    plan = get_plan(queryset)
+    assert index_name in plan, f"{index_name} is not used:\n{plan}"
@@ -0,0 +1,113 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from ..models import Category, Comment, Post
+from ..pagecache import get_group_versions
+from ..widgets import get_category_counts
+from accounts.models import Profile, User
+
+
+@pytest.fixture
+def user_profile():
+    data = {"email": "test@test.com", "password": "a/1234567"}
+    user = User.objects.create_user(**data, is_verify=True)
+    return Profile.objects.get(user=user)
+
+
+@pytest.fixture
+def published_posts(user_profile):
+    category = Category.objects.create(name="category")
+    posts = []
+    for i in range(3):
+        post = Post.objects.create(
+            author=user_profile,
+            title=f"test title {i}",
+            content="test content",
+            status=True,
+            published_date=timezone.now(),
+        )
+        post.category.set([category])
+        posts.append(post)
+    Post.objects.create(
+        author=user_profile,
+        title="draft",
+        content="test content",
+        published_date=timezone.now(),
+    )
+    return posts
+
+
+@pytest.mark.django_db
+class TestExportPostsCommand:
+    def test_export_posts_writes_published_posts(self, published_posts):
+        out = StringIO()
+        call_command("export_posts", "--chunk-size", "2", stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [row["id"] for row in rows] == [
+            post.id for post in published_posts
+        ]
+        assert rows[0]["author"] == "test@test.com"
+        assert rows[0]["category"] == ["category"]
+
+    def test_export_posts_since(self, published_posts):
+        since = timezone.now() + timedelta(minutes=1)
+        Post.objects.filter(id=published_posts[1].id).update(
+            updated_date=since
+        )
+        out = StringIO()
+        call_command("export_posts", "--since", since.isoformat(), stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [row["id"] for row in rows] == [published_posts[1].id]
+
+    @pytest.mark.parametrize("since", ["yesterday", "2020-13-45T00:00:00"])
+    def test_export_posts_invalid_since(self, since):
+        with pytest.raises(CommandError):
+            call_command("export_posts", "--since", since, stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestBackfillPostTextCommand:
+    def test_backfill_post_text(self, published_posts):
+        Post.objects.update(excerpt="", word_count=0, reading_time=0)
+        out = StringIO()
+        call_command("backfill_post_text", "--chunk-size", "2", stdout=out)
+        assert "Successfully updated 4 post(s)" in out.getvalue()
+        for post in Post.objects.all():
+            assert post.excerpt == "test content"
+            assert post.word_count == 2
+            assert post.reading_time == 1
+
+
+@pytest.mark.django_db
+class TestRecountCommand:
+    def test_recount_repairs_drift(self, published_posts):
+        post = published_posts[0]
+        Comment.objects.create(
+            post=post, name="test", email="test@test.com", message="test"
+        )
+        Post.objects.update(comment_count=5)
+        Category.objects.update(post_count=0)
+        # the sidebar and the pages were cached with the drifted counts
+        assert get_category_counts() == []
+        groups = ["posts", "sidebar", f"post:{post.id}"]
+        before = get_group_versions(groups)
+        out = StringIO()
+        call_command("recount", "--chunk-size", "2", stdout=out)
+        assert "Successfully fixed 5 count(s)" in out.getvalue()
+        assert get_category_counts() == [("category", "category", 3)]
+        after = get_group_versions(groups)
+        assert all(new > old for old, new in zip(before, after))
+        counts = dict(Post.objects.values_list("id", "comment_count"))
+        assert counts.pop(post.id) == 1
+        assert set(counts.values()) == {0}
+        assert Category.objects.get().post_count == 3
+
+    def test_recount_without_drift(self, published_posts):
+        out = StringIO()
+        call_command("recount", stdout=out)
+        assert "Successfully fixed 0 count(s)" in out.getvalue()
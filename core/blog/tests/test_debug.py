@@ -0,0 +1,55 @@
+from datetime import datetime
+import warnings
+
+import pytest
+from django.template import Context, Template
+
+from ..debug import LazyRelationLoadWarning, warn_lazy_relation_loads
+from ..models import Category, Post
+from accounts.models import Profile, User
+
+
+@pytest.fixture
+def create_post():
+    user = User.objects.create_user(
+        email="test@test.com", password="a/1234567"
+    )
+    post = Post.objects.create(
+        author=Profile.objects.get(user=user),
+        title="test title",
+        content="test content",
+        status=True,
+        published_date=datetime.now(),
+    )
+    post.category.add(Category.objects.create(name="category"))
+    return post
+
+
+TEMPLATE = Template(
+    "{{ post.author }}{% for cat in post.category.all %}{{ cat }}{% endfor %}"
+)
+
+
+@pytest.mark.django_db
+class TestLazyRelationLoads:
+    def test_lazy_loads_warn(self, create_post):
+        """
+        testing a template loading the author and categories of a bare
+        post warns once per relation
+        """
+        post = Post.objects.get(pk=create_post.pk)
+        with pytest.warns(LazyRelationLoadWarning) as record:
+            with warn_lazy_relation_loads():
+                TEMPLATE.render(Context({"post": post}))
+        assert len(record) == 3
+
+    def test_listing_queryset_does_not_warn(self, create_post):
+        """
+        testing the listing queryset loads every relation of the cards
+        """
+        post = Post.objects.published().for_listing().get()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", LazyRelationLoadWarning)
+            with warn_lazy_relation_loads():
+                output = TEMPLATE.render(Context({"post": post}))
+        assert output == "test@test.comcategory"
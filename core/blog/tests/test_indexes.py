@@ -0,0 +1,68 @@
+import pytest
+from django.utils import timezone
+
+from .explain import assert_uses_index
+from ..keyset import COMMENT_ORDERING, POST_ORDERING, KeysetPaginator
+from ..models import Comment, Post
+from accounts.models import Profile, User
+
+
+@pytest.fixture
+def seeded_posts():
+    user = User.objects.create_user(
+        email="test@test.com", password="a/1234567"
+    )
+    profile = Profile.objects.get(user=user)
+    posts = Post.objects.bulk_create(
+        Post(
+            author=profile,
+            title=f"{i}",
+            content="content",
+            status=i % 4 != 0,
+            published_date=timezone.now(),
+        )
+        for i in range(200)
+    )
+    post = Post.objects.first()
+    Comment.objects.bulk_create(
+        Comment(post_id=post.id, name=f"{i}", email="a@a.com", message="m")
+        for i in range(50)
+    )
+    return posts
+
+
+@pytest.mark.django_db
+class TestIndexes:
+    def test_published_listing_uses_partial_index(self, seeded_posts):
+        """
+        testing published posts are listed and keyset paginated from the
+        partial index, without sorting
+        """
+        posts = Post.objects.published()
+        assert_uses_index(posts[:4], "blog_post_published_idx")
+        paginator = KeysetPaginator(POST_ORDERING, 4)
+        cursor = paginator.encode_cursor(posts[4])
+        values, _ = paginator.decode_cursor(cursor, Post)
+        keyset = posts.filter(paginator.get_keyset_filter(values)).order_by(
+            *paginator.get_ordering()
+        )
+        assert_uses_index(keyset[:5], "blog_post_published_idx")
+
+    def test_scheduled_posts_use_partial_index(self, seeded_posts):
+        """
+        testing publish_posts_task finds the due posts through an index
+        """
+        posts = Post.objects.filter(
+            status=False, published_date__lte=timezone.now()
+        )
+        assert_uses_index(posts, "blog_post_scheduled_idx")
+
+    def test_post_comments_use_index(self, seeded_posts):
+        """
+        testing a page of comments of a post is read from the index
+        """
+        post = Post.objects.first()
+        comments = Comment.objects.filter(post=post).order_by(
+            *KeysetPaginator(COMMENT_ORDERING, 10).get_ordering()
+        )
+        assert_uses_index(comments[:10], "blog_comment_post_updated_idx")
@@ -1,7 +1,10 @@
+import os
 import pytest
 from datetime import datetime
+from django.core.files.uploadedfile import SimpleUploadedFile
 
 from ..models import Post, Category, Comment
+from ..tasks import purge_post_task
 from accounts.models import Profile, User
 
 
@@ -44,6 +47,27 @@ class TestPostModel:
         assert post.author == user_profile
         assert post.content == "test content"
 
+    def test_post_model_text_fields(self, user_profile, settings):
+        settings.BLOG_EXCERPT_LENGTH = 20
+        settings.BLOG_READING_WORDS_PER_MINUTE = 2
+        data = {
+            "author": user_profile,
+            "title": "test title",
+            "content": "<p>first <b>second</b> third&amp;fourth fifth</p>",
+            "published_date": datetime.now(),
+        }
+        post = Post.objects.create(**data)
+        assert post.excerpt == "first second…"
+        assert post.word_count == 4
+        assert post.reading_time == 2
+        assert post.get_snippet() == post.excerpt
+
+        post.content = "one"
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        assert post.excerpt == "one"
+        assert post.word_count == 1
+
 
 @pytest.mark.django_db
 class TestCategoryModel:
@@ -70,3 +94,108 @@ class TestCommentModel:
         assert comment_obj.name == "test"
         assert comment_obj.email == "test@test.com"
         assert comment_obj.message == "test message"
+
+    def test_comment_count(self, create_post):
+        data = {"name": "test", "email": "test@test.com", "message": "test"}
+        first = Comment.objects.create(post=create_post, **data)
+        Comment.objects.create(post=create_post, **data)
+        create_post.refresh_from_db()
+        assert create_post.comment_count == 2
+        first.delete()
+        create_post.refresh_from_db()
+        assert create_post.comment_count == 1
+
+    def test_post_save_keeps_comment_count(self, create_post):
+        post = Post.objects.get(pk=create_post.pk)
+        Comment.objects.create(
+            post=create_post, name="test", email="test@test.com", message="m"
+        )
+        # the stale loaded count is not written back
+        post.title = "new title"
+        post.save()
+        post.refresh_from_db()
+        assert post.title == "new title"
+        assert post.comment_count == 1
+
+
+@pytest.mark.django_db
+class TestCategoryPostCount:
+    def post_count(self, category):
+        category.refresh_from_db()
+        return category.post_count
+
+    def test_published_posts_are_counted(self, create_post):
+        category = Category.objects.create(name="test")
+        create_post.category.add(category)
+        assert self.post_count(category) == 0
+        create_post.status = True
+        create_post.save()
+        assert self.post_count(category) == 1
+        create_post.status = False
+        create_post.save()
+        assert self.post_count(category) == 0
+
+    def test_category_changes_of_published_post(self, create_post):
+        create_post.status = True
+        create_post.save()
+        first = Category.objects.create(name="first")
+        second = Category.objects.create(name="second")
+        create_post.category.add(first, second)
+        assert (self.post_count(first), self.post_count(second)) == (1, 1)
+        create_post.category.remove(first)
+        assert self.post_count(first) == 0
+        create_post.category.clear()
+        assert self.post_count(second) == 0
+        second.post_set.add(create_post)
+        assert self.post_count(second) == 1
+        second.post_set.clear()
+        assert self.post_count(second) == 0
+
+    def test_deleted_post_is_uncounted(self, create_post):
+        category = Category.objects.create(name="test")
+        create_post.status = True
+        create_post.save()
+        create_post.category.add(category)
+        Post.objects.filter(pk=create_post.pk).delete()
+        assert self.post_count(category) == 0
+
+
+@pytest.mark.django_db
+class TestPostSoftDelete:
+    def test_soft_deleted_post_is_hidden_and_uncounted(
+        self, create_post, user_profile
+    ):
+        category = Category.objects.create(name="test")
+        create_post.status = True
+        create_post.save()
+        create_post.category.add(category)
+        create_post.soft_delete()
+        assert not Post.objects.exists()
+        assert not user_profile.post_set.exists()
+        assert not category.post_set.exists()
+        assert Post.all_objects.get().status is False
+        category.refresh_from_db()
+        assert category.post_count == 0
+
+    def test_purge_post_task(self, create_post, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        settings.BLOG_PURGE_BATCH_SIZE = 2
+        create_post.image = SimpleUploadedFile("post.jpg", b"image")
+        create_post.save()
+        path = create_post.image.path
+        create_post.category.add(Category.objects.create(name="test"))
+        for i in range(5):
+            Comment.objects.create(
+                post=create_post, name="t", email="t@t.com", message="t"
+            )
+        create_post.soft_delete()
+        purge_post_task(create_post.pk)
+        assert not Post.all_objects.exists()
+        assert not Comment.objects.exists()
+        assert not Post.category.through.objects.exists()
+        assert Category.objects.exists()
+        assert not os.path.exists(path)
+
+    def test_purge_post_task_keeps_live_posts(self, create_post):
+        purge_post_task(create_post.pk)
+        assert Post.objects.filter(pk=create_post.pk).exists()
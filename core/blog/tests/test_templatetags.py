@@ -0,0 +1,116 @@
+from datetime import datetime
+import pytest
+
+from ..models import Category, Post
+from ..pagecache import get_group_versions
+from ..tasks import rebuild_widgets_task
+from ..templatetags.blog_tags import (
+    categories_tag,
+    recent_post_tag,
+    top_stories_tag,
+)
+from accounts.models import Profile, User
+from website.templatetags.website_tags import (
+    website_latest_posts,
+    website_popular_posts,
+)
+
+
+@pytest.fixture
+def user_profile():
+    user = User.objects.create_user(
+        email="test@test.com", password="a/1234567"
+    )
+    return Profile.objects.get(user=user)
+
+
+@pytest.fixture
+def create_post(user_profile):
+    post = Post.objects.create(
+        author=user_profile,
+        title="test title",
+        content="test content",
+        status=True,
+        published_date=datetime.now(),
+    )
+    post.category.add(Category.objects.create(name="category"))
+    return post
+
+
+@pytest.mark.django_db
+class TestBlogTags:
+    def test_categories_tag_is_cached(
+        self,
+        create_post,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        testing categories_tag reads the counters with one query, then the
+        cache until a post is unpublished
+        """
+        Category.objects.create(name="empty")
+        with django_assert_num_queries(1):
+            assert categories_tag()["categories"] == [
+                ("category", "category", 1)
+            ]
+        with django_assert_num_queries(0):
+            assert categories_tag()["categories"] == [
+                ("category", "category", 1)
+            ]
+        post = create_post
+        post.status = False
+        with django_capture_on_commit_callbacks(execute=True):
+            post.save()
+        assert categories_tag() == {"categories": []}
+
+    def test_post_widgets_are_cached(
+        self,
+        create_post,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        testing the post widgets are built with two queries, then read
+        from the cache and rebuilt in the background on post changes
+        """
+        with django_assert_num_queries(2):
+            assert [p["id"] for p in top_stories_tag()["posts"]] == [
+                create_post.id
+            ]
+        with django_assert_num_queries(0):
+            assert recent_post_tag()["post"]["title"] == "test title"
+            website_latest_posts()
+            website_popular_posts()
+        post = create_post
+        post.title = "new title"
+        with django_capture_on_commit_callbacks(execute=True):
+            post.save()
+        with django_assert_num_queries(0):
+            assert recent_post_tag()["post"]["title"] == "new title"
+
+    def test_widget_rebuild_purges_pages(self, create_post):
+        """
+        testing the background rebuild purges the pages rendered with the
+        old widgets after the post change was committed
+        """
+        before = get_group_versions(["posts", "sidebar"])
+        rebuild_widgets_task()
+        after = get_group_versions(["posts", "sidebar"])
+        assert all(new > old for old, new in zip(before, after))
+
+    def test_top_stories_tag_shows_the_oldest_posts(self, user_profile):
+        """
+        testing top_stories_tag keeps the last two posts of the listing
+        """
+        for day in range(1, 5):
+            Post.objects.create(
+                author=user_profile,
+                title=f"{day}",
+                content="content",
+                status=True,
+                published_date=datetime(2023, 1, day),
+            )
+        titles = [p["title"] for p in top_stories_tag()["posts"]]
+        assert titles == ["2", "1"]
+        assert recent_post_tag()["post"]["title"] == "4"
@@ -33,7 +33,7 @@ class TestBlogUrlsResolve:
         assert resolve(url).func.view_class == views.CategoryCreateView
 
     def test_url_blog_category_view(self):
-        url = reverse("blog:category", kwargs={"cat_name": "test"})
+        url = reverse("blog:category", kwargs={"slug": "test"})
         assert resolve(url).func.view_class == views.CategoryListView
 
     def test_url_blog_search_view(self):
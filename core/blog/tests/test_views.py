@@ -1,10 +1,13 @@
 from datetime import datetime
 import pytest
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
-from ..models import Category, Post
+from ..metrics import get_metrics
+from ..models import Category, Comment, Post
 from accounts.models import Profile, User
 
 
@@ -112,6 +115,232 @@ class TestBlogViews:
         response = anonymous_user.get(url)
         assert response.status_code == 404
 
+    def test_blog_single_view_GET_conditional(
+        self, anonymous_user, create_post, django_capture_on_commit_callbacks
+    ):
+        """
+        testing BlogSingleView answers If-None-Match with 304, changes the
+        ETag when a comment is added and sends no Last-Modified
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        url = reverse("blog:single", kwargs={"pk": post.id})
+        response = anonymous_user.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+
+        response = anonymous_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert not response.content
+        assert not response.has_header("Last-Modified")
+        # a deleted comment moves no date forward, never trust the date
+        since = "Fri, 01 Jan 2100 00:00:00 GMT"
+        response = anonymous_user.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Comment.objects.create(
+                post=post, name="test", email="test@test.com", message="test"
+            )
+        response = anonymous_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_blog_single_view_GET_paginates_comments(
+        self, anonymous_user, create_post
+    ):
+        """
+        testing BlogSingleView only renders one page of comments and links
+        to the older ones
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        for i in range(12):
+            Comment.objects.create(
+                post=post, name=f"{i}", email="test@test.com", message="test"
+            )
+        url = reverse("blog:single", kwargs={"pk": post.id})
+        response = anonymous_user.get(url)
+        assert len(response.context["data"]) == 10
+        assert response.context["comments_count"] == 12
+        response = anonymous_user.get(
+            url, {"comments": response.context["comments_next"]}
+        )
+        assert [c.name for c, _ in response.context["data"]] == ["1", "0"]
+        assert response.context["comments_next"] is None
+        response = anonymous_user.get(url, {"comments": "broken"})
+        assert response.status_code == 404
+
+    def test_blog_single_view_GET_comment_avatars(
+        self, anonymous_user, create_post, django_assert_max_num_queries
+    ):
+        """
+        testing BlogSingleView resolves the comment avatars with a fixed
+        number of queries and falls back to the default avatar for
+        unknown emails
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        for i in range(10):
+            Comment.objects.create(
+                post=post,
+                name=f"{i}",
+                email="test@test.com" if i % 2 else f"guest{i}@test.com",
+                message="test",
+            )
+        url = reverse("blog:single", kwargs={"pk": post.id})
+        with django_assert_max_num_queries(12) as queries:
+            response = anonymous_user.get(url)
+        assert response.status_code == 200
+        assert '"accounts_user"."email" IN' in str(
+            [q["sql"] for q in queries.captured_queries]
+        )
+        avatars = {c.email: url for c, url in response.context["data"]}
+        assert len(avatars) == 6
+        assert set(avatars.values()) == {"/media/accounts/avatars/default.jpg"}
+
+        # the second render reads every avatar from the cache
+        with django_assert_max_num_queries(11) as queries:
+            anonymous_user.get(url)
+        assert '"accounts_user"."email" IN' not in str(
+            [q["sql"] for q in queries.captured_queries]
+        )
+
+    def test_blog_index_view_GET_caches_post_cards(
+        self, anonymous_user, logged_user, create_post
+    ):
+        """
+        testing BlogIndexView reuses the rendered post cards between
+        visitors and only shows the owner controls to the owner
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        post.category.add(Category.objects.create(name="category"))
+        url = reverse("blog:index")
+        with CaptureQueriesContext(connection) as cold:
+            response = anonymous_user.get(url)
+        assert b"Edit post" not in response.content
+        with CaptureQueriesContext(connection) as warm:
+            response = anonymous_user.get(url)
+        assert len(warm) < len(cold)
+        assert b"test@test.com" in response.content
+        assert b"Edit post" not in response.content
+        response = logged_user.get(url)
+        assert b"Edit post" in response.content
+
+    def test_blog_index_view_GET_post_cards_follow_categories(
+        self, logged_user, create_post, django_capture_on_commit_callbacks
+    ):
+        """
+        testing a renamed category shows up in the cached post cards
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        category = Category.objects.create(name="old name")
+        post.category.add(category)
+        url = reverse("blog:index")
+        assert b"old name" in logged_user.get(url).content
+        category.name = "new name"
+        with django_capture_on_commit_callbacks(execute=True):
+            category.save()
+        content = logged_user.get(url).content
+        assert b"new name" in content
+        assert b"old name" not in content
+
+    def test_anonymous_page_cache_purges_only_affected_pages(
+        self, anonymous_user, create_post, django_capture_on_commit_callbacks
+    ):
+        """
+        testing anonymous pages are served from the cache, with a csrf
+        token of the visitor, until something they show changes
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        index_url = reverse("blog:index")
+        single_url = reverse("blog:single", kwargs={"pk": post.id})
+        about_url = reverse("website:about")
+        assert b"0 comments" in anonymous_user.get(index_url).content
+        anonymous_user.get(single_url)
+        anonymous_user.get(about_url)
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(index_url)
+        assert len(queries) == 0
+        assert response.status_code == 200
+        assert b"test title" in response.content
+        assert "csrftoken" in response.cookies
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Comment.objects.create(
+                post=post, name="test", email="test@test.com", message="test"
+            )
+        # the post cards of the index show the comment count
+        assert b"1 comment" in anonymous_user.get(index_url).content
+        with CaptureQueriesContext(connection) as queries:
+            anonymous_user.get(about_url)
+        assert len(queries) == 0
+        response = anonymous_user.get(single_url)
+        assert response.context["comments_count"] == 1
+
+        post.title = "new title"
+        with django_capture_on_commit_callbacks(execute=True):
+            post.save()
+        response = anonymous_user.get(index_url)
+        assert b"new title" in response.content
+
+    def test_anonymous_page_cache_skips_logged_users(
+        self, logged_user, create_post
+    ):
+        """
+        testing pages of logged in users are never cached
+        """
+        url = reverse("blog:index")
+        logged_user.get(url)
+        response = logged_user.get(url)
+        assert response.context is not None
+
+    def test_blog_index_view_GET_cached_count(
+        self, logged_user, create_post, django_capture_on_commit_callbacks
+    ):
+        """
+        testing BlogIndexView reuses the cached post count until a post
+        is published
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        url = reverse("blog:index")
+        assert logged_user.get(url).context["paginator"].count == 1
+        with CaptureQueriesContext(connection) as queries:
+            response = logged_user.get(url)
+        assert response.context["paginator"].count == 1
+        assert not any("COUNT(*)" in q["sql"] for q in queries)
+        with django_capture_on_commit_callbacks(execute=True):
+            Post.objects.create(
+                author=post.author,
+                title="second",
+                content="second",
+                status=True,
+                published_date=datetime.now(),
+            )
+        assert logged_user.get(url).context["paginator"].count == 2
+
+    def test_blog_index_view_GET_conditional(self, anonymous_user):
+        """
+        testing BlogIndexView answers a matching If-None-Match with 304
+        """
+        url = reverse("blog:index")
+        etag = anonymous_user.get(url)["ETag"]
+        response = anonymous_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        response = anonymous_user.get(url + "?page=1", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
     def test_blog_create_post_view_GET_auth_user_verified(self, logged_user):
         """
         Testing BlogCreatePostView in GET method with authorized and
@@ -332,6 +561,30 @@ class TestBlogViews:
         response = logged_user.get(url)
         assert response.status_code == 200
 
+    def test_blog_delete_post_view_GET_loads_post_once(
+        self, logged_user, create_post, create_post_not_owner
+    ):
+        """
+        Testing BlogDeletePostView checks the owner with a single SELECT
+        of the post and its author
+        """
+        for post, status_code in (
+            (create_post, 200),
+            (create_post_not_owner, 302),
+        ):
+            url = reverse("blog:delete-post", kwargs={"pk": post.id})
+            with CaptureQueriesContext(connection) as queries:
+                response = logged_user.get(url)
+            assert response.status_code == status_code
+            selects = [
+                q["sql"]
+                for q in queries.captured_queries
+                if 'FROM "blog_post"' in q["sql"]
+                or '"accounts_profile"' in q["sql"]
+            ]
+            assert len(selects) == 1
+            assert 'INNER JOIN "accounts_profile"' in selects[0]
+
     def test_blog_delete_post_view_GET_auth_user_verified_but_not_owner(
         self, logged_user, create_post_not_owner
     ):
@@ -381,6 +634,28 @@ class TestBlogViews:
         response = logged_user.delete(url)
         assert response.status_code == 302
 
+    def test_blog_delete_post_view_POST_purges_in_background(
+        self, logged_user, create_post, django_capture_on_commit_callbacks
+    ):
+        """
+        Testing BlogDeletePostView hides the post at once and deletes it
+        with its comments once the transaction is committed
+        """
+        post = create_post
+        Comment.objects.create(
+            post=post, name="test", email="test@test.com", message="test"
+        )
+        url = reverse("blog:delete-post", kwargs={"pk": post.id})
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = logged_user.post(url)
+        assert response.status_code == 302
+        assert not Post.objects.filter(pk=post.id).exists()
+        assert Post.all_objects.get(pk=post.id).deleted_date is not None
+        for callback in callbacks:
+            callback()
+        assert not Post.all_objects.filter(pk=post.id).exists()
+        assert not Comment.objects.exists()
+
     def test_blog_delete_post_view_DELETE_auth_user_verified_but_not_owner(
         self, logged_user, create_post_not_owner
     ):
@@ -480,7 +755,7 @@ class TestBlogViews:
         verified user
         """
         cat = create_category
-        url = reverse("blog:category", kwargs={"cat_name": cat.name})
+        url = reverse("blog:category", kwargs={"slug": cat.slug})
         response = logged_user.get(url)
         assert response.status_code == 200
 
@@ -491,11 +766,49 @@ class TestBlogViews:
         Testing CategoryListView in GET method with anonymous user
         """
         cat = create_category
-        url = reverse("blog:category", kwargs={"cat_name": cat.name})
+        url = reverse("blog:category", kwargs={"slug": cat.slug})
         response = anonymous_user.get(url)
         # redirect to login page
         assert response.status_code == 200
 
+    def test_category_list_view_GET_by_slug(
+        self, anonymous_user, create_post
+    ):
+        """
+        Testing CategoryListView keeps categories with the same name apart
+        and answers an unknown slug with 404
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        first = Category.objects.create(name="Same Name")
+        second = Category.objects.create(name="Same Name")
+        post.category.add(first)
+        assert (first.slug, second.slug) == ("same-name", "same-name-2")
+        url = reverse("blog:category", kwargs={"slug": first.slug})
+        assert list(anonymous_user.get(url).context["posts"]) == [post]
+        url = reverse("blog:category", kwargs={"slug": second.slug})
+        assert list(anonymous_user.get(url).context["posts"]) == []
+        url = reverse("blog:category", kwargs={"slug": "missing"})
+        assert anonymous_user.get(url).status_code == 404
+
+    def test_category_list_view_GET_unicode_slug(
+        self, anonymous_user, create_post
+    ):
+        """
+        Testing the sidebar links and CategoryListView of a category with
+        a non ASCII name
+        """
+        post = create_post
+        post.status = True
+        post.save()
+        category = Category.objects.create(name="برنامه نویسی")
+        post.category.add(category)
+        assert category.slug == "برنامه-نویسی"
+        assert anonymous_user.get(reverse("blog:index")).status_code == 200
+        url = reverse("blog:category", kwargs={"slug": category.slug})
+        assert list(anonymous_user.get(url).context["posts"]) == [post]
+
     def test_category_create_view_GET_auth_user_verified(self, logged_user):
         """
         Testing CategoryCreateView in GET method with authorized and
@@ -570,3 +883,58 @@ class TestBlogViews:
         url = reverse("blog:search") + "?Search=test"
         response = anonymous_user.get(url)
         assert response.status_code == 200
+
+    def test_search_view_GET_filters_posts(
+        self, anonymous_user, create_post, create_post_not_owner
+    ):
+        """
+        Testing SearchView only returns posts matching the search term
+        """
+        Post.objects.update(status=True)
+        url = reverse("blog:search") + "?Search=user2"
+        response = anonymous_user.get(url)
+        assert response.status_code == 200
+        assert list(response.context["posts"]) == [create_post_not_owner]
+
+    def test_search_view_GET_without_query(self, anonymous_user):
+        """
+        Testing SearchView shows no posts when the query is missing
+        """
+        response = anonymous_user.get(reverse("blog:search"))
+        assert response.status_code == 200
+        assert list(response.context["posts"]) == []
+
+    def test_search_view_GET_caches_matching_ids(
+        self, anonymous_user, user_profile
+    ):
+        """
+        Testing SearchView runs the search once per normalized query and
+        pages through the cached ids
+        """
+        for i in range(5):
+            Post.objects.create(
+                author=user_profile,
+                title=f"{i}",
+                content="needle in content",
+                status=True,
+                published_date=datetime(2023, 1, i + 1),
+            )
+        url = reverse("blog:search")
+        response = anonymous_user.get(url, {"Search": "needle"})
+        assert [p.title for p in response.context["posts"]] == [
+            "4",
+            "3",
+            "2",
+            "1",
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous_user.get(
+                url, {"Search": "  NEEDLE ", "page": 2}
+            )
+        assert [p.title for p in response.context["posts"]] == ["0"]
+        assert not any(
+            "LIKE" in q["sql"] and "LIMIT 1000" in q["sql"]
+            for q in queries.captured_queries
+        )
+        assert get_metrics()["search_cache_misses"] == 1
+        assert get_metrics()["search_cache_hits"] == 1
@@ -1,13 +1,25 @@
-from django.urls import path, include
+from django.urls import path, include, register_converter
 
 from . import views
+from .converters import UnicodeSlugConverter
+from .pagecache import cache_anonymous_page
 
 
+register_converter(UnicodeSlugConverter, "uslug")
+
 app_name = "blog"
 
 urlpatterns = [
-    path("", views.BlogIndexView.as_view(), name="index"),
-    path("<int:pk>/", views.BlogSingleView.as_view(), name="single"),
+    path(
+        "",
+        cache_anonymous_page(views.BlogIndexView.as_view()),
+        name="index",
+    ),
+    path(
+        "<int:pk>/",
+        cache_anonymous_page(views.BlogSingleView.as_view()),
+        name="single",
+    ),
     path(
         "create-post/",
         views.BlogCreatePostView.as_view(),
@@ -25,8 +37,8 @@ urlpatterns = [
     ),
     path("comment/", views.BlogCommentCreateView.as_view(), name="comment"),
     path(
-        "category/<str:cat_name>/",
-        views.CategoryListView.as_view(),
+        "category/<uslug:slug>/",
+        cache_anonymous_page(views.CategoryListView.as_view()),
         name="category",
     ),
     path(
@@ -0,0 +1,42 @@
+import math
+from html import unescape
+
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+
+
+def html_to_text(html):
+    """
+    Convert rich text html to plain text with collapsed whitespace.
+    """
+    return " ".join(unescape(strip_tags(html or "")).split())
+
+
+def text_summary(html, excerpt_length, words_per_minute):
+    """
+    Return (excerpt, word count, reading time in minutes) of rich text.
+    """
+    text = html_to_text(html)
+    word_count = len(text.split())
+    excerpt = text
+    if len(text) > excerpt_length:
+        # cut at the last whole word that fits, with room for the ellipsis
+        excerpt = text[: excerpt_length - 1]
+        if " " in excerpt:
+            excerpt = excerpt.rsplit(" ", 1)[0]
+        excerpt = excerpt.rstrip() + "…"
+    reading_time = math.ceil(word_count / words_per_minute)
+    return excerpt, word_count, reading_time
+
+
+def unique_slug(queryset, value, field="slug"):
+    """
+    Slugify value and add a -2, -3, ... suffix until no row of the
+    queryset uses it.
+    """
+    base = slugify(value, allow_unicode=True) or "category"
+    slug, number = base, 1
+    while queryset.filter(**{field: slug}).exists():
+        number += 1
+        slug = f"{base}-{number}"
+    return slug
@@ -1,17 +1,64 @@
+from django.conf import settings
+from django.shortcuts import get_object_or_404
 from django.views import generic
 from django.contrib import messages
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse, reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
 
+from accounts.avatars import get_avatar_urls
+from core.routers import primary_reads
 from accounts.models import Profile
-from .models import Post, Comment
+from .models import Category, Comment, Post
 from .forms import CategoryForm, PostForm, CommentForm
-from .permissions import UserIsVerifiedMixin
+from .permissions import PostOwnerRequiredMixin, UserIsVerifiedMixin
+from .conditional import (
+    ConditionalGetMixin,
+    post_detail_validators,
+    post_list_validators,
+)
+from .pagecache import get_group_versions
+from .paginator import CachedCountPaginator
+from .search import search_post_ids, search_posts
+from .keyset import COMMENT_ORDERING, InvalidCursor, KeysetPaginator
+
+
+class PostCardsMixin:
+    """
+    Context of the post cards in blog/blog-post-card.html. The shared part
+    of every card is a cached fragment keyed by post id, updated date and
+    the version of the "posts" purge group (category changes), the owner
+    controls are decided from `owned_author_ids` outside of it.
+    """
+
+    def get(self, request, *args, **kwargs):
+        # the listing fills the shared card fragments, read it from the
+        # primary after an invalidation like every other cached result
+        # (core.routers.primary_reads)
+        with primary_reads():
+            response = super().get(request, *args, **kwargs)
+            response.render()
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        context["owned_author_ids"] = (
+            set(
+                Profile.objects.filter(user=user).values_list(
+                    "id", flat=True
+                )
+            )
+            if user.is_authenticated
+            else set()
+        )
+        context["post_card_timeout"] = settings.BLOG_POST_CARD_CACHE_TIMEOUT
+        (context["post_card_version"],) = get_group_versions(["posts"])
+        return context
 
 
-class BlogIndexView(generic.ListView):
+class BlogIndexView(ConditionalGetMixin, PostCardsMixin, generic.ListView):
     """
     Class that show all the published posts
     """
@@ -19,40 +66,49 @@ class BlogIndexView(generic.ListView):
     allow_empty = True
     context_object_name = "posts"
     paginate_by = 4
-    queryset = Post.objects.filter(status=True)
+    paginator_class = CachedCountPaginator
+    queryset = Post.objects.published().for_listing()
     template_name = "blog/blog-index.html"
 
+    def get_validators(self):
+        return post_list_validators()
 
-class BlogSingleView(generic.DetailView):
+
+class BlogSingleView(ConditionalGetMixin, generic.DetailView):
     """
     Class that show detail of a Post object
     """
 
     context_object_name = "post"
     # model = Post
-    queryset = Post.objects.filter(status=True)
+    queryset = Post.objects.published().with_relations()
     template_name = "blog/blog-single.html"
+    comments_paginate_by = 10
+    comments_cursor_param = "comments"
+
+    def get_validators(self):
+        return post_detail_validators(self.kwargs["pk"])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = self.get_object()
-        if obj:
-            try:
-                comments = Comment.objects.filter(post=obj)
-            except Comment.DoesNotExist:
-                pass
-            else:
-                data = []
-                for comment in comments:
-                    data.append(
-                        (
-                            comment,
-                            Profile.objects.get(
-                                user__email=comment.email
-                            ).image,
-                        )
-                    )
-                context["data"] = data
+        obj = self.object
+        paginator = KeysetPaginator(
+            COMMENT_ORDERING, self.comments_paginate_by
+        )
+        try:
+            comments = paginator.paginate(
+                Comment.objects.filter(post=obj),
+                self.request.GET.get(self.comments_cursor_param),
+            )
+        except InvalidCursor:
+            raise Http404("Invalid comments cursor")
+        avatars = get_avatar_urls(comment.email for comment in comments)
+        context["data"] = [
+            (comment, avatars[comment.email]) for comment in comments
+        ]
+        context["comments_count"] = obj.comment_count
+        context["comments_next"] = comments.next_cursor
+        context["comments_previous"] = comments.previous_cursor
         return context
 
 
@@ -85,7 +141,10 @@ class BlogCreatePostView(
 
 
 class BlogEditPostView(
-    LoginRequiredMixin, UserIsVerifiedMixin, generic.UpdateView
+    LoginRequiredMixin,
+    UserIsVerifiedMixin,
+    PostOwnerRequiredMixin,
+    generic.UpdateView,
 ):
     """
     Class to update the existing post by the owner of post
@@ -93,32 +152,12 @@ class BlogEditPostView(
 
     form_class = PostForm
     model = Post
+    owner_required_message = (
+        "You can not update this post, "
+        "Every post only can updated by its owner"
+    )
     template_name = "blog/blog-update-post.html"
 
-    def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        user = Profile.objects.get(user__email=request.user)
-        if self.object.author != user:
-            messages.error(
-                request,
-                "You can not update this post, \
-                Every post only can updated by its owner",
-            )
-            return HttpResponseRedirect(reverse("blog:index"))
-        return super().get(request, *args, **kwargs)
-
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        user = Profile.objects.get(user__email=request.user)
-        if self.object.author != user:
-            messages.error(
-                request,
-                "You can not update this post, \
-                Every post only can updated by its owner",
-            )
-            return HttpResponseRedirect(reverse("blog:index"))
-        return super().post(request, *args, **kwargs)
-
     def form_invalid(self, form):
         """If the form is invalid, render the invalid form."""
         messages.error(self.request, "Something went wrong.")
@@ -132,40 +171,35 @@ class BlogEditPostView(
 
 
 class BlogDeletePostView(
-    LoginRequiredMixin, UserIsVerifiedMixin, generic.DeleteView
+    LoginRequiredMixin,
+    UserIsVerifiedMixin,
+    PostOwnerRequiredMixin,
+    generic.DeleteView,
 ):
     """
     Class to delete an existing post by its owner
     """
 
     model = Post
+    owner_required_message = (
+        "You can not delete this post, "
+        "Every post only can be deleted by its owner"
+    )
     success_url = reverse_lazy("blog:index")
 
-    def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        user = Profile.objects.get(user__email=request.user)
-        if self.object.author != user:
-            messages.error(
-                request,
-                "You can not delete this post, \
-                Every post only can be deleted by its owner",
-            )
-            return HttpResponseRedirect(reverse("blog:index"))
-        return super().get(request, *args, **kwargs)
-
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        user = Profile.objects.get(user__email=request.user)
-        if self.object.author != user:
-            messages.error(
-                request,
-                "You can not delete this post, \
-                Every post only can be deleted by its owner",
-            )
-            return HttpResponseRedirect(reverse("blog:index"))
         messages.success(request, "Post deleted successfully")
         return super().post(request, *args, **kwargs)
 
+    def delete(self, request, *args, **kwargs):
+        """
+        Soft delete the post, its comments are purged in the background.
+        """
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        self.object.soft_delete()
+        return HttpResponseRedirect(success_url)
+
 
 class BlogCommentCreateView(
     LoginRequiredMixin, UserIsVerifiedMixin, generic.CreateView
@@ -191,22 +225,30 @@ class BlogCommentCreateView(
         return super().form_valid(form)
 
 
-class CategoryListView(generic.ListView):
+class CategoryListView(PostCardsMixin, generic.ListView):
     """
-    Class that show all the published posts
+    Class that show all the published posts of a category
     """
 
     allow_empty = True
     context_object_name = "posts"
     paginate_by = 4
-    pk_url_kwarg = "cat_name"
+    paginator_class = CachedCountPaginator
     template_name = "blog/blog-index.html"
 
     def get_queryset(self):
-        posts = Post.objects.filter(
-            status=True, category__name=self.kwargs["cat_name"]
+        # resolve the slug first, so the posts are filtered by category_id
+        self.category = get_object_or_404(Category, slug=self.kwargs["slug"])
+        return (
+            Post.objects.published()
+            .for_listing()
+            .filter(category=self.category)
         )
-        return posts
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["category"] = self.category
+        return context
 
 
 class CategoryCreateView(
@@ -232,18 +274,40 @@ class CategoryCreateView(
         return super().form_valid(form)
 
 
-class SearchView(generic.ListView):
+class SearchView(PostCardsMixin, generic.ListView):
     """
-    Class to search based on content field in Post model.
+    Class to search in Post model, full text search over title and content
+    on PostgreSQL and content field lookup on other databases. The ids of
+    the matching posts are cached, so every page only loads its own posts.
     """
 
     allow_empty = True
     context_object_name = "posts"
+    fallback_lookups = ("content__icontains",)
     paginate_by = 4
+    search_param = "Search"
     template_name = "blog/blog-index.html"
 
+    def get_search_query(self):
+        return self.request.GET.get(self.search_param, "").strip()
+
     def get_queryset(self):
-        posts = Post.objects.filter(
-            status=True, content__contains=self.request.GET["Search"]
+        query = self.get_search_query()
+        if not query:
+            return []
+        return search_post_ids(
+            Post.objects.published(), query, self.fallback_lookups
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, ids, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        posts = search_posts(
+            Post.objects.published().for_listing().filter(id__in=ids),
+            self.get_search_query(),
+            self.fallback_lookups,
         )
-        return posts
+        posts = {post.id: post for post in posts}
+        page.object_list = [posts[pk] for pk in ids if pk in posts]
+        return paginator, page, page.object_list, is_paginated
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import primary_reads
+
+from .caching import widget_key
+from .models import Category, Post
+
+
+# number of posts shown by each post widget
+LATEST_POSTS = 6
+POPULAR_POSTS = 4
+TOP_STORIES = 2
+REBUILD_PENDING_KEY = "blog:widget:rebuild-pending"
+
+
+def build_category_counts():
+    """
+    Return (name, slug, published posts) of the non empty categories from
+    their post_count column.
+    """
+    return list(
+        Category.objects.filter(post_count__gt=0)
+        .order_by("id")
+        .values_list("name", "slug", "post_count")
+    )
+
+
+def get_category_counts():
+    """
+    Return the category counts from the shared cache, rebuilt on a miss.
+    """
+    key = widget_key("categories")
+    counts = cache.get(key)
+    if counts is None:
+        with primary_reads():
+            counts = build_category_counts()
+        cache.set(key, counts, settings.BLOG_WIDGET_CACHE_TIMEOUT)
+    return counts
+
+
+def _post_items(queryset):
+    # only what the widget templates show, no model instances
+    rows = queryset.values(
+        "id", "title", "image", "published_date", "author__user__email"
+    )
+    storage = Post._meta.get_field("image").storage
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "image_url": storage.url(row["image"]) if row["image"] else "",
+            "published_date": row["published_date"],
+            "author": row["author__user__email"],
+        }
+        for row in rows
+    ]
+
+
+def build_post_widgets():
+    """
+    Return {widget name: list of post items} of every post widget with
+    two queries, the newest posts and the oldest ones.
+    """
+    posts = Post.objects.published().order_by(
+        "-published_date", "-created_date"
+    )
+    newest = _post_items(posts[:LATEST_POSTS])
+    # the last posts of the listing order, read from the other end
+    # instead of slicing at an offset of count() - 2
+    oldest = _post_items(posts.reverse()[:TOP_STORIES])
+    return {
+        "latest_posts": newest,
+        "popular_posts": newest[:POPULAR_POSTS],
+        "recent_post": newest[:1],
+        "top_stories": oldest[::-1],
+    }
+
+
+def rebuild_post_widgets():
+    """
+    Build every post widget and store it in the shared cache.
+    """
+    with primary_reads():
+        widgets = build_post_widgets()
+    cache.set_many(
+        {widget_key(name): items for name, items in widgets.items()},
+        settings.BLOG_WIDGET_CACHE_TIMEOUT,
+    )
+    return widgets
+
+
+def get_post_widget(name):
+    """
+    Return the post items of a widget from the shared cache, every post
+    widget is rebuilt at once on a miss.
+    """
+    items = cache.get(widget_key(name))
+    if items is None:
+        items = rebuild_post_widgets()[name]
+    return items
+
+
+def schedule_widget_rebuild():
+    """
+    Queue one background rebuild of the post widgets, repeated calls
+    before the worker picks it up do not queue it again.
+    """
+    from .tasks import rebuild_widgets_task
+
+    if cache.add(REBUILD_PENDING_KEY, True, 60):
+        rebuild_widgets_task.delay()
@@ -0,0 +1,30 @@
+import pytest
+from django.core.cache import cache
+
+from core.celery import app as celery_app
+
+
+@pytest.fixture(autouse=True)
+def local_memory_cache(settings):
+    """
+    Run every test against an empty local memory cache instead of redis.
+    """
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_celery_tasks():
+    """
+    Run queued celery tasks in process instead of sending them to the
+    broker.
+    """
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
@@ -0,0 +1,84 @@
+"""
+PostgreSQL backend with the CONN_HEALTH_CHECKS option of Django 4.1.
+
+A persistent connection (CONN_MAX_AGE) is checked once per request before
+its first query, a connection the server or a pooler dropped is replaced
+instead of failing the request. Opened, reused and replaced connections
+are counted per process and added to blog.metrics after requests.
+"""
+import logging
+import time
+from collections import Counter
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.postgresql import base
+from django.dispatch import receiver
+
+from blog.metrics import incr
+
+logger = logging.getLogger(__name__)
+
+# seconds between two flushes of the counters to the shared cache
+FLUSH_INTERVAL = 10
+_counters = Counter()
+_last_flush = 0.0
+
+
+def flush_counters():
+    """
+    Add the counters of this process to blog.metrics, a failing cache
+    loses them instead of failing the request.
+    """
+    global _last_flush
+    _last_flush = time.monotonic()
+    counters = dict(_counters)
+    _counters.clear()
+    try:
+        for name, delta in counters.items():
+            incr(name, delta)
+    except Exception:
+        logger.warning(
+            "Could not flush the connection counters", exc_info=True
+        )
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    def connect(self):
+        super().connect()
+        # a new connection needs no check
+        self.health_check_done = True
+        _counters["db_connections_opened"] += 1
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done:
+            # first use of a persistent connection in this request
+            self.health_check_done = True
+            if (
+                self.settings_dict.get("CONN_HEALTH_CHECKS")
+                and not self.in_atomic_block
+                and not self.is_usable()
+            ):
+                _counters["db_connections_unusable"] += 1
+                self.close()
+            else:
+                _counters["db_connections_reused"] += 1
+        super().ensure_connection()
+
+
+@receiver(request_started)
+def reset_health_checks(**kwargs):
+    for connection in connections.all():
+        if isinstance(connection, DatabaseWrapper):
+            connection.health_check_done = False
+
+
+@receiver(request_finished)
+def flush_counters_after_request(**kwargs):
+    # after the response is sent, and only now and then
+    if _counters and time.monotonic() - _last_flush >= FLUSH_INTERVAL:
+        flush_counters()
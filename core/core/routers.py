@@ -0,0 +1,162 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# routing of the current request, set by ReplicaRoutingMiddleware
+_routing = ContextVar("db_routing", default=None)
+
+# time of the last shared cache invalidation, see primary_reads
+INVALIDATED_KEY = "db:cache-invalidated"
+
+
+class Routing:
+    """
+    Routing state of a request, mutable so a write seen in a copied
+    context (sync views under asgi) still pins the request.
+    """
+
+    def __init__(self, read_only):
+        self.read_only = read_only
+        self.wrote = False
+
+
+def get_replicas():
+    """
+    Return the aliases of the read replicas, every DATABASES entry whose
+    name starts with "replica".
+    """
+    return [alias for alias in connections if alias.startswith("replica")]
+
+
+@contextmanager
+def replica_reads():
+    """
+    Send the reads of the block to the replicas, for read only work that
+    runs outside of a request (commands, celery tasks).
+    """
+    token = _routing.set(Routing(read_only=True))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def note_cache_invalidation():
+    """
+    Record that a shared cache was invalidated after a write committed on
+    the primary, call it wherever a cache version is bumped or an entry
+    dropped.
+    """
+    cache.set(
+        INVALIDATED_KEY, time.time(), settings.DATABASE_PRIMARY_PIN_SECONDS
+    )
+
+
+def recently_invalidated():
+    """
+    Return whether a shared cache was invalidated within the last
+    DATABASE_PRIMARY_PIN_SECONDS, the time the replicas may lag behind.
+    """
+    invalidated = cache.get(INVALIDATED_KEY)
+    return (
+        invalidated is not None
+        and time.time() - invalidated < settings.DATABASE_PRIMARY_PIN_SECONDS
+    )
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from the primary inside the block of a read only request, while
+    shared caches were recently invalidated.
+
+    For results stored in shared caches: their versions are bumped when a
+    write commits on the primary, a replica that is still behind would
+    store the old data under the new version. Once the replicas had
+    DATABASE_PRIMARY_PIN_SECONDS to catch up the block reads them again.
+    """
+    routing = _routing.get()
+    if (
+        routing is None
+        or not routing.read_only
+        or not get_replicas()
+        or not recently_invalidated()
+    ):
+        yield
+        return
+    routing.read_only = False
+    try:
+        yield
+    finally:
+        routing.read_only = True
+
+
+class ReplicaRouter:
+    """
+    Send the reads of read only requests to a random replica and every
+    other query to the primary database. A request that writes sticks to
+    the primary for the rest of the request and, through a cookie, for
+    DATABASE_PRIMARY_PIN_SECONDS afterwards so the client reads its own
+    writes despite the replication lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or not routing.read_only or routing.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # reads of a transaction must see its own writes
+            return DEFAULT_DB_ALIAS
+        replicas = get_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema by replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Mark safe method requests of clients without a recent write as read
+    only for ReplicaRouter, and pin clients that wrote to the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = settings.DATABASE_PRIMARY_PIN_COOKIE
+        routing = Routing(
+            read_only=request.method in ("GET", "HEAD", "OPTIONS")
+            and cookie not in request.COOKIES
+        )
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and get_replicas():
+            response.set_cookie(
+                cookie,
+                "1",
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
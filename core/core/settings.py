@@ -69,6 +69,7 @@ SITE_ID = config("SITE_ID", cast=int, default=1)
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.routers.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -111,17 +112,50 @@ if DEBUG:
 else:
     DATABASES = {
         "default": {
-            "ENGINE": config(
-                "DB_ENGINE", default="django.db.backends.postgresql"
-            ),
+            # django.db.backends.postgresql with CONN_HEALTH_CHECKS
+            "ENGINE": config("DB_ENGINE", default="core.postgresql"),
             "NAME": config("DB_NAME", default="postgres"),
             "USER": config("DB_USER", default="postgres"),
             "PASSWORD": config("DB_PASS", default="postgres"),
             "HOST": config("DB_HOST", default="db"),
             "PORT": config("DB_PORT", cast=int, default=5432),
+            # seconds a gunicorn worker keeps its connection between
+            # requests, checked before its first query of each request
+            "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", cast=int, default=60),
+            "CONN_HEALTH_CHECKS": config(
+                "DB_CONN_HEALTH_CHECKS", cast=bool, default=True
+            ),
+            # pgbouncer in transaction pooling mode can not keep the
+            # server side cursors of QuerySet.iterator() between fetches
+            "DISABLE_SERVER_SIDE_CURSORS": config(
+                "DB_PGBOUNCER_TRANSACTION_POOLING", cast=bool, default=False
+            ),
         }
     }
 
+# optional read replicas of the default database, comma separated hosts,
+# named replica, replica2, ... (see core/routers.py). Locally DB_REPLICA_HOSTS
+# can name sqlite files instead.
+DB_REPLICA_HOSTS = config(
+    "DB_REPLICA_HOSTS",
+    cast=lambda v: [s.strip() for s in v.split(",") if s.strip()],
+    default="",
+)
+for number, host in enumerate(DB_REPLICA_HOSTS, 1):
+    replica = dict(DATABASES["default"], TEST={"MIRROR": "default"})
+    if replica["ENGINE"] == "django.db.backends.sqlite3":
+        replica["NAME"] = BASE_DIR / host
+    else:
+        replica["HOST"] = host
+    DATABASES["replica" if number == 1 else f"replica{number}"] = replica
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# seconds a client that wrote keeps reading from the primary database,
+# longer than the replication lag
+DATABASE_PRIMARY_PIN_SECONDS = config(
+    "DATABASE_PRIMARY_PIN_SECONDS", cast=int, default=10
+)
+DATABASE_PRIMARY_PIN_COOKIE = "db_primary"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -182,6 +216,13 @@ AUTH_USER_MODEL = "accounts.User"
 LOGIN_URL = "accounts:login"
 LOGIN_REDIRECT_URL = "/"
 
+# length in characters of the plain text excerpt stored on every post
+# and the reading speed used for its reading time
+BLOG_EXCERPT_LENGTH = config("BLOG_EXCERPT_LENGTH", cast=int, default=300)
+BLOG_READING_WORDS_PER_MINUTE = config(
+    "BLOG_READING_WORDS_PER_MINUTE", cast=int, default=200
+)
+
 # message framework config
 MESSAGE_TAGS = {
     messages.DEBUG: "alert-secondary",
@@ -237,6 +278,10 @@ if config("USE_SSL_CONFIG", cast=bool, default=False):
 """######################################################"""
 """################## Third Party apps ##################"""
 
+# warn about relations that templates load lazily (n+1 queries)
+if DEBUG:
+    MIDDLEWARE.append("blog.debug.LazyRelationLoadMiddleware")
+
 # debug toolbar settings
 if DEBUG:
     INSTALLED_APPS.append("debug_toolbar")
@@ -283,6 +328,17 @@ CORS_ALLOW_METHODS = ["GET"]
 
 CELERY_BROKER_URL = "redis://redis:6379/1"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "published posts every one hour": {
+        "task": "blog.tasks.publish_posts_task",
+        "schedule": 60 * 60,
+    },
+    # soft deleted posts whose purge task was lost
+    "purge soft deleted posts every one hour": {
+        "task": "blog.tasks.purge_deleted_posts_task",
+        "schedule": 60 * 60,
+    },
+}
 
 # caching configs
 CACHES = {
@@ -294,6 +350,49 @@ CACHES = {
         },
     }
 }
+# seconds to keep anonymous blog api responses, entries also go stale
+# whenever posts, categories or comments change
+BLOG_API_CACHE_TIMEOUT = config(
+    "BLOG_API_CACHE_TIMEOUT", cast=int, default=60 * 15
+)
+# seconds to keep the sidebar widgets, they are also dropped as soon as
+# the posts they show change
+BLOG_WIDGET_CACHE_TIMEOUT = config(
+    "BLOG_WIDGET_CACHE_TIMEOUT", cast=int, default=60 * 60
+)
+# seconds to keep the rendered post cards of the list pages, a new
+# updated_date of the post makes a new card
+BLOG_POST_CARD_CACHE_TIMEOUT = config(
+    "BLOG_POST_CARD_CACHE_TIMEOUT", cast=int, default=60 * 10
+)
+# seconds to keep the html pages served to anonymous visitors, pages are
+# also purged as soon as the posts, comments or categories they show change
+BLOG_PAGE_CACHE_TIMEOUT = config(
+    "BLOG_PAGE_CACHE_TIMEOUT", cast=int, default=60 * 10
+)
+# seconds to keep the post ids matching a search query, and the most ids
+# kept per query
+BLOG_SEARCH_CACHE_TIMEOUT = config(
+    "BLOG_SEARCH_CACHE_TIMEOUT", cast=int, default=60 * 2
+)
+BLOG_SEARCH_MAX_RESULTS = config(
+    "BLOG_SEARCH_MAX_RESULTS", cast=int, default=1000
+)
+# seconds to keep the row counts of paginated lists, on PostgreSQL lists
+# estimated above the threshold use the planner estimate instead of COUNT
+BLOG_COUNT_CACHE_TIMEOUT = config(
+    "BLOG_COUNT_CACHE_TIMEOUT", cast=int, default=60 * 5
+)
+BLOG_PAGINATOR_ESTIMATE_THRESHOLD = config(
+    "BLOG_PAGINATOR_ESTIMATE_THRESHOLD", cast=int, default=100000
+)
+# rows of a soft deleted post (comments, categories) deleted per statement
+BLOG_PURGE_BATCH_SIZE = config("BLOG_PURGE_BATCH_SIZE", cast=int, default=1000)
+# seconds to keep the avatar url of a comment email, dropped when the
+# profile changes
+AVATAR_CACHE_TIMEOUT = config(
+    "AVATAR_CACHE_TIMEOUT", cast=int, default=60 * 60 * 24
+)
 
 # swagger configs
 SWAGGER_SETTINGS = {
@@ -0,0 +1,12 @@
+from ..celery import app
+
+
+class TestCeleryApp:
+    def test_periodic_tasks_are_scheduled(self):
+        app.loader.import_default_modules()
+        tasks = {entry["task"] for entry in app.conf.beat_schedule.values()}
+        assert tasks == {
+            "blog.tasks.publish_posts_task",
+            "blog.tasks.purge_deleted_posts_task",
+        }
+        assert tasks <= set(app.tasks)
@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pytest
+from django.core.signals import request_started
+from django.db import connections
+
+from blog.metrics import get_metrics
+
+base = pytest.importorskip("core.postgresql.base")
+
+
+@pytest.fixture
+def wrapper(monkeypatch, django_db_blocker):
+    """
+    A backend wrapper without a server, connect() hands out a new marker
+    object and the health check answers from `usable`.
+    """
+    settings_dict = dict(connections["default"].settings_dict)
+    settings_dict.update(CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True)
+    wrapper = base.DatabaseWrapper(settings_dict, alias="health-check")
+    wrapper.usable = True
+    monkeypatch.setattr(base, "_counters", Counter())
+
+    def connect(self):
+        self.connection = object()
+        self.autocommit = True
+
+    monkeypatch.setattr(base.base.DatabaseWrapper, "connect", connect)
+    monkeypatch.setattr(wrapper, "is_usable", lambda: wrapper.usable)
+    monkeypatch.setattr(
+        wrapper, "close", lambda: setattr(wrapper, "connection", None)
+    )
+    monkeypatch.setattr(
+        base.connections, "all", lambda: [wrapper], raising=False
+    )
+    with django_db_blocker.unblock():
+        yield wrapper
+
+
+class TestHealthCheckedConnections:
+    def test_persistent_connection_is_reused(self, wrapper):
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        request_started.send(sender=None)
+        wrapper.ensure_connection()
+        wrapper.ensure_connection()
+        assert wrapper.connection is first
+        base.flush_counters()
+        metrics = get_metrics()
+        assert metrics["db_connections_opened"] == 1
+        assert metrics["db_connections_reused"] == 1
+
+    def test_unusable_connection_is_replaced(self, wrapper):
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        wrapper.usable = False
+        request_started.send(sender=None)
+        wrapper.ensure_connection()
+        assert wrapper.connection is not first
+        base.flush_counters()
+        metrics = get_metrics()
+        assert metrics["db_connections_opened"] == 2
+        assert metrics["db_connections_unusable"] == 1
+
+    def test_cache_errors_do_not_break_connections(
+        self, wrapper, monkeypatch
+    ):
+        def incr(name, delta):
+            raise ConnectionError("cache is down")
+
+        monkeypatch.setattr(base, "incr", incr)
+        wrapper.ensure_connection()
+        base.flush_counters()
+        assert wrapper.connection is not None
+        assert not base._counters
@@ -0,0 +1,133 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.utils.connection import ConnectionDoesNotExist
+from django.urls import reverse
+
+from .. import routers
+from ..routers import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    note_cache_invalidation,
+    primary_reads,
+    replica_reads,
+)
+from blog.models import Category
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    monkeypatch.setattr(routers, "get_replicas", lambda: ["replica"])
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter()
+
+
+class TestReplicaRouter:
+    def test_reads_outside_requests_use_primary(self, replicas, router):
+        assert router.db_for_read(Category) == "default"
+
+    def test_read_only_block_uses_replica(self, replicas, router):
+        with replica_reads():
+            assert router.db_for_read(Category) == "replica"
+            assert router.db_for_write(Category) == "default"
+            # read your own writes
+            assert router.db_for_read(Category) == "default"
+
+    def test_primary_reads_block(self, replicas, router):
+        note_cache_invalidation()
+        with replica_reads():
+            with primary_reads():
+                assert router.db_for_read(Category) == "default"
+            assert router.db_for_read(Category) == "replica"
+
+    def test_primary_reads_only_after_invalidation(
+        self, replicas, router, monkeypatch, settings
+    ):
+        settings.DATABASE_PRIMARY_PIN_SECONDS = 5
+        with replica_reads():
+            with primary_reads():
+                assert router.db_for_read(Category) == "replica"
+            note_cache_invalidation()
+            with primary_reads():
+                assert router.db_for_read(Category) == "default"
+            # the replicas had time to catch up
+            now = routers.time.time()
+            monkeypatch.setattr(routers.time, "time", lambda: now + 5)
+            with primary_reads():
+                assert router.db_for_read(Category) == "replica"
+
+    def test_no_replicas_use_primary(self, router):
+        with replica_reads():
+            assert router.db_for_read(Category) == "default"
+
+    @pytest.mark.django_db
+    def test_transactions_use_primary(self, replicas, router):
+        with replica_reads(), transaction.atomic():
+            assert router.db_for_read(Category) == "default"
+
+    def test_only_primary_is_migrated(self, router):
+        assert router.allow_migrate("default", "blog")
+        assert not router.allow_migrate("replica", "blog")
+
+
+class TestReplicaRoutingMiddleware:
+    def get_response(self, write=False):
+        router = ReplicaRouter()
+
+        def view(request):
+            if write:
+                router.db_for_write(Category)
+            return HttpResponse(router.db_for_read(Category))
+
+        return ReplicaRoutingMiddleware(view)
+
+    def test_safe_request_reads_replica(self, replicas):
+        response = self.get_response()(RequestFactory().get("/"))
+        assert response.content == b"replica"
+        assert "db_primary" not in response.cookies
+
+    def test_write_pins_client_to_primary(self, replicas, settings):
+        settings.DATABASE_PRIMARY_PIN_SECONDS = 5
+        response = self.get_response(write=True)(RequestFactory().post("/"))
+        assert response.content == b"default"
+        assert response.cookies["db_primary"]["max-age"] == 5
+
+        request = RequestFactory().get("/")
+        request.COOKIES["db_primary"] = "1"
+        assert self.get_response()(request).content == b"default"
+
+
+# outside of a test transaction, reads in transactions use the primary
+@pytest.mark.django_db(transaction=True)
+class TestSharedCachesReadPrimary:
+    """
+    Results stored in shared caches are read from the primary, a lagging
+    replica would store stale data under a new cache version. The test
+    replica alias does not exist, so any read routed to it fails.
+    """
+
+    urls = (
+        ("website:index", ""),
+        ("blog:index", ""),
+        ("blog:search", "?Search=test"),
+        ("blog:api-v1:category", ""),
+    )
+
+    def test_cache_fills_read_primary(self, replicas):
+        client = Client()
+        for name, query in self.urls:
+            cache.clear()
+            note_cache_invalidation()
+            assert client.get(reverse(name) + query).status_code == 200
+
+    def test_cache_fills_read_replica_once_caught_up(self, replicas):
+        client = Client()
+        for name, query in self.urls:
+            cache.clear()
+            with pytest.raises(ConnectionDoesNotExist):
+                client.get(reverse(name) + query)
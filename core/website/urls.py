@@ -1,13 +1,19 @@
 from django.urls import path
 
+from blog.pagecache import cache_anonymous_page
+
 from . import views
 
 
 app_name = "website"
 
 urlpatterns = [
-    path("", views.IndexView.as_view(), name="index"),
-    path("about/", views.AboutView.as_view(), name="about"),
+    path("", cache_anonymous_page(views.IndexView.as_view()), name="index"),
+    path(
+        "about/",
+        cache_anonymous_page(views.AboutView.as_view()),
+        name="about",
+    ),
     path("contact/", views.ContactView.as_view(), name="contact"),
     path("newsletter/", views.NewsletterView.as_view(), name="newsletter"),
 ]